@@ -55,6 +55,7 @@ INSTALLED_APPS = [
     'apps.booking',
     'apps.payments',
     'apps.reviews',
+    'apps.notifications',
     'rest_framework',
     'drf_yasg',
     'rest_framework_simplejwt',
@@ -103,6 +104,10 @@ REST_FRAMEWORK = {
 
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
         'PAGE_SIZE': 10,
+
+    'DEFAULT_THROTTLE_RATES': {
+        'booking-quote': os.getenv("BOOKING_QUOTE_RATE", "30/min"),
+    },
 }
 
 
@@ -175,6 +180,58 @@ LOGGING = {
 
 
 
+# Caches
+# Local memory works for a single process. With several workers point the cache at a
+# shared store (CACHE_REDIS_URL, needs the `redis` package) so that invalidation of
+# cached listing responses is seen by every process.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'stayflow',
+    }
+}
+
+if os.getenv("CACHE_REDIS_URL"):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv("CACHE_REDIS_URL"),
+    }
+
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_TIMEOUT", 300))
+
+# Listing views are buffered per process and written in batches by a background thread this often (seconds).
+VIEW_COUNT_FLUSH_INTERVAL = int(os.getenv("VIEW_COUNT_FLUSH_INTERVAL", 10))
+
+# Trending listings: activity loses half its weight every TRENDING_HALF_LIFE_HOURS.
+# Scores are relative to TRENDING_EPOCH; when moving it forward, run
+# `manage.py rebuild_trending_scores` right after deploying.
+TRENDING_HALF_LIFE_HOURS = float(os.getenv("TRENDING_HALF_LIFE_HOURS", 24))
+TRENDING_EPOCH = os.getenv("TRENDING_EPOCH", "2026-01-01")
+TRENDING_WINDOW_DAYS = int(os.getenv("TRENDING_WINDOW_DAYS", 14))
+
+# Pending booking requests reserve their dates for this long; afterwards
+# `manage.py expire_booking_holds` (run it from cron) marks them expired.
+BOOKING_HOLD_TTL = timedelta(hours=int(os.getenv("BOOKING_HOLD_TTL_HOURS", 24)))
+
+# Notifications are written to the outbox table and delivered by
+# `manage.py send_notifications`. The console backend prints them; set
+# EMAIL_BACKEND=django.core.mail.backends.smtp.EmailBackend (plus EMAIL_HOST/EMAIL_PORT,
+# e.g. a local `python -m aiosmtpd -n` on port 8025) to send real mail.
+EMAIL_BACKEND = os.getenv("EMAIL_BACKEND", "django.core.mail.backends.console.EmailBackend")
+EMAIL_HOST = os.getenv("EMAIL_HOST", "localhost")
+EMAIL_PORT = int(os.getenv("EMAIL_PORT", 25))
+DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", "StayFlow <no-reply@stayflow.local>")
+NOTIFICATION_MAX_ATTEMPTS = int(os.getenv("NOTIFICATION_MAX_ATTEMPTS", 5))
+NOTIFICATION_RETRY_DELAY = int(os.getenv("NOTIFICATION_RETRY_DELAY", 60))
+# Seconds a worker may spend sending a claimed batch before other workers retry it.
+NOTIFICATION_CLAIM_TIMEOUT = int(os.getenv("NOTIFICATION_CLAIM_TIMEOUT", 300))
+# When > 0, host events (new booking requests, new listings) are collected for this
+# many seconds and sent as one digest per host.
+NOTIFICATION_DIGEST_WINDOW = int(os.getenv("NOTIFICATION_DIGEST_WINDOW", 0))
+
+
 WSGI_APPLICATION = 'Test_StayFlow.wsgi.application'
 
 
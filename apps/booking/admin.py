@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.utils.html import format_html
 
-from .models import Booking, BookingLog
+from .models import Booking, BookingLog, CommissionPolicy
 
 
 @admin.register(Booking)
@@ -30,6 +30,12 @@ class BookingAdmin(admin.ModelAdmin):
         return obj.rent.owner.email if obj.rent and obj.rent.owner else '—'
 
 
+@admin.register(CommissionPolicy)
+class CommissionPolicyAdmin(admin.ModelAdmin):
+    list_display = ['city_key', 'rate', 'updated_at']
+    search_fields = ['city_key']
+
+
 @admin.register(BookingLog)
 class BookingLogAdmin(admin.ModelAdmin):
     list_display = ['booking', 'user', 'action', 'timestamp']
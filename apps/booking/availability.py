@@ -0,0 +1,179 @@
+from calendar import monthrange
+from datetime import date, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.booking.models import Booking, RentCalendar, RentNight
+from apps.rent.cache import invalidate_on_commit
+from apps.rent.models import Rent
+
+HELD_STATUSES = ('pending', 'confirmed')
+CALENDAR_BYTES = 46  # 366 days rounded up to whole bytes
+
+
+def nights_between(start_date, end_date):
+    """Every night from start_date up to, but not including, end_date."""
+    return [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days)]
+
+
+def sync_booking_nights(booking):
+    """
+    Make the RentNight rows of `booking` match its current dates and status.
+    Returns the (rent_id, year) pairs whose calendars may have changed.
+    """
+    existing = RentNight.objects.filter(booking=booking)
+    touched = set(existing.values_list('rent_id', 'night__year').distinct())
+    existing.delete()
+    if booking.status not in HELD_STATUSES:
+        return touched
+
+    nights = nights_between(booking.start_date, booking.end_date)
+    RentNight.objects.bulk_create([
+        RentNight(
+            rent_id=booking.rent_id, booking=booking, night=night, status=booking.status,
+            confirmed=True if booking.status == 'confirmed' else None,
+        )
+        for night in nights
+    ])
+    return touched | {(booking.rent_id, night.year) for night in nights}
+
+
+def merged_intervals(rent_id, since, statuses=('confirmed',)):
+    """Sorted, non-overlapping [start, end) date intervals booked for the rent after `since`."""
+    intervals = []
+    bookings = Booking.objects.filter(
+        rent_id=rent_id, status__in=statuses, end_date__gt=since
+    ).order_by('start_date').values_list('start_date', 'end_date')
+    for start, end in bookings:
+        if intervals and start <= intervals[-1][1]:
+            intervals[-1][1] = max(intervals[-1][1], end)
+        else:
+            intervals.append([start, end])
+    return intervals
+
+
+def free_windows(rent_id, start_date, end_date, limit=3, earliest=None):
+    """
+    Suggest up to `limit` free [start, end) windows as long as the requested
+    stay, nearest to `start_date` first. Each gap between booked intervals
+    contributes the placement closest to the requested dates.
+    """
+    length = end_date - start_date
+    earliest = earliest or date.today()
+
+    candidates = []
+    gap_start = earliest
+    for booked_start, booked_end in merged_intervals(rent_id, earliest) + [[None, None]]:
+        latest_start = booked_start - length if booked_start is not None else None
+        if latest_start is None or latest_start >= gap_start:
+            best = max(gap_start, start_date)
+            if latest_start is not None:
+                best = min(best, latest_start)
+            candidates.append(best)
+        if booked_end is not None:
+            gap_start = max(gap_start, booked_end)
+
+    candidates.sort(key=lambda day: (abs((day - start_date).days), day))
+    return [(day, day + length) for day in candidates[:limit]]
+
+
+def _bitmap(days):
+    bits = 0
+    for day in days:
+        bits |= 1 << day
+    return bits.to_bytes(CALENDAR_BYTES, 'little')
+
+
+def refresh_calendars(pairs):
+    """Rebuild the RentCalendar rows for the given (rent_id, year) pairs from RentNight."""
+    for rent_id, year in pairs:
+        booked, held = set(), set()
+        nights = RentNight.objects.filter(
+            rent_id=rent_id, night__gte=date(year, 1, 1), night__lt=date(year + 1, 1, 1)
+        ).values_list('night', 'status')
+        for night, status in nights:
+            day = night.timetuple().tm_yday - 1
+            (booked if status == 'confirmed' else held).add(day)
+
+        RentCalendar.objects.update_or_create(
+            rent_id=rent_id, year=year,
+            defaults={'booked': _bitmap(booked), 'held': _bitmap(held - booked)},
+        )
+
+
+def month_calendar(rent_id, first_month, months):
+    """
+    Return [{'month': 'YYYY-MM', 'booked': [days], 'held': [days]}, ...] for
+    `months` months starting at `first_month` (a date on the 1st). Days not
+    listed are free.
+    """
+    last_year = first_month.year + (first_month.month + months - 2) // 12
+    bitmaps = {
+        year: (int.from_bytes(booked, 'little'), int.from_bytes(held, 'little'))
+        for year, booked, held in RentCalendar.objects.filter(
+            rent_id=rent_id, year__gte=first_month.year, year__lte=last_year
+        ).values_list('year', 'booked', 'held')
+    }
+
+    result = []
+    year, month = first_month.year, first_month.month
+    for _ in range(months):
+        booked, held = bitmaps.get(year, (0, 0))
+        offset = date(year, month, 1).timetuple().tm_yday - 1
+        days = range(1, monthrange(year, month)[1] + 1)
+        result.append({
+            'month': f"{year}-{month:02d}",
+            'booked': [day for day in days if booked >> (offset + day - 1) & 1],
+            'held': [day for day in days if held >> (offset + day - 1) & 1],
+        })
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return result
+
+
+def release_pending(booking_ids, status, now=None):
+    """
+    Move the still-pending bookings among `booking_ids` to `status` with a
+    single UPDATE and free their nights. Booking.save and its signals are
+    bypassed, so the nights, calendars and response cache are updated here.
+    Returns the number of bookings changed.
+    """
+    nights = RentNight.objects.filter(booking_id__in=booking_ids, status='pending')
+    touched = set(nights.values_list('rent_id', 'night__year').distinct())
+    changed = Booking.objects.filter(pk__in=booking_ids, status='pending').update(
+        status=status, updated_at=now or timezone.now()
+    )
+    nights.delete()
+    refresh_calendars(touched)
+    invalidate_on_commit()
+    return changed
+
+
+def lock_rent(rent_id):
+    """
+    Take the row lock of the rent for the rest of the current transaction, so
+    booking changes of one rent run one after another.
+    """
+    list(Rent.all_objects.select_for_update().filter(pk=rent_id).values_list('pk', flat=True))
+
+
+def has_confirmed_overlap(rent_id, start_date, end_date, exclude_booking=None):
+    nights = RentNight.objects.filter(
+        rent_id=rent_id, night__gte=start_date, night__lt=end_date, confirmed=True
+    )
+    if exclude_booking is not None:
+        nights = nights.exclude(booking=exclude_booking)
+    return nights.exists()
+
+
+def unavailable_rent_ids(check_in, check_out, include_pending=False):
+    """
+    Subquery of rent ids with at least one held night in [check_in, check_out).
+    Pending nights whose hold ran out but were not swept yet do not count.
+    """
+    held = Q(status='confirmed')
+    if include_pending:
+        held |= Q(status='pending') & (
+            Q(booking__hold_expires_at__isnull=True) | Q(booking__hold_expires_at__gt=timezone.now())
+        )
+    return RentNight.objects.filter(held, night__gte=check_in, night__lt=check_out).values('rent_id')
@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.booking.availability import release_pending
+from apps.booking.models import Booking
+from apps.booking.utils import send_hold_expired_notification
+
+
+def hold_deadline(moment=None):
+    return (moment or timezone.now()) + settings.BOOKING_HOLD_TTL
+
+
+def expire_holds(now=None, batch_size=500):
+    """
+    Expire every pending booking whose hold ran out, `batch_size` rows per
+    transaction: one UPDATE flips the batch to 'expired' and one DELETE frees
+    its nights. The renter notifications go to the outbox in the same transaction.
+    Returns the number of expired bookings.
+    """
+    now = now or timezone.now()
+    expired = 0
+
+    while True:
+        with transaction.atomic():
+            ids = list(
+                Booking.objects.select_for_update(skip_locked=True)
+                .filter(status='pending', hold_expires_at__lte=now)
+                .order_by('hold_expires_at')
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+
+            release_pending(ids, 'expired', now)
+            for booking in Booking.objects.select_related('renter', 'rent').filter(pk__in=ids).order_by():
+                send_hold_expired_notification(booking)
+
+        expired += len(ids)
+
+        if len(ids) < batch_size:
+            break
+
+    return expired
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.booking.holds import expire_holds
+
+
+class Command(BaseCommand):
+    help = "Expire pending bookings whose hold ran out and free their dates."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--interval', type=int, default=0,
+                            help="Keep running and sweep every N seconds instead of once.")
+
+    def handle(self, *args, **options):
+        while True:
+            expired = expire_holds(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Expired {expired} booking holds."))
+
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:15
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_nights(apps, schema_editor):
+    Booking = apps.get_model('booking', 'Booking')
+    RentNight = apps.get_model('booking', 'RentNight')
+    nights = []
+    bookings = Booking.objects.filter(status__in=['pending', 'confirmed']).values_list(
+        'id', 'rent_id', 'start_date', 'end_date', 'status'
+    )
+    for booking_id, rent_id, start_date, end_date, status in bookings.iterator():
+        nights += [
+            RentNight(rent_id=rent_id, booking_id=booking_id, night=start_date + timedelta(days=offset), status=status)
+            for offset in range((end_date - start_date).days)
+        ]
+    RentNight.objects.bulk_create(nights, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0004_booking_base_price_booking_commission_percent_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RentNight',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('night', models.DateField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('confirmed', 'Confirmed')], max_length=10)),
+                ('booking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='nights', to='booking.booking')),
+                ('rent', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='nights', to='rent.rent')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['night', 'status', 'rent'], name='rent_night_lookup_idx'), models.Index(fields=['rent', 'night'], name='rent_night_rent_idx')],
+                'constraints': [models.UniqueConstraint(fields=('booking', 'night'), name='rent_night_booking_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_nights, migrations.RunPython.noop),
+    ]
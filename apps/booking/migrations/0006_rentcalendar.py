@@ -0,0 +1,51 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:16
+
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_calendars(apps, schema_editor):
+    RentNight = apps.get_model('booking', 'RentNight')
+    RentCalendar = apps.get_model('booking', 'RentCalendar')
+    bitmaps = defaultdict(lambda: [0, 0])
+    for rent_id, night, status in RentNight.objects.values_list('rent_id', 'night', 'status').iterator():
+        bits = bitmaps[rent_id, night.year]
+        bits[0 if status == 'confirmed' else 1] |= 1 << (night.timetuple().tm_yday - 1)
+
+    RentCalendar.objects.bulk_create(
+        [
+            RentCalendar(
+                rent_id=rent_id, year=year,
+                booked=booked.to_bytes(46, 'little'),
+                held=(held & ~booked).to_bytes(46, 'little'),
+            )
+            for (rent_id, year), (booked, held) in bitmaps.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0005_rentnight'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RentCalendar',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('booked', models.BinaryField(default=b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00', max_length=46)),
+                ('held', models.BinaryField(default=b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00', max_length=46)),
+                ('rent', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='calendars', to='rent.rent')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('rent', 'year'), name='rent_calendar_year_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_calendars, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:20
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def mark_confirmed_nights(apps, schema_editor):
+    RentNight = apps.get_model('booking', 'RentNight')
+    RentNight.objects.filter(status='confirmed').update(confirmed=True)
+
+    # Nights confirmed twice before the rent lock existed would break the
+    # constraint below. The oldest booking keeps the night; the others lose
+    # the marker on the clashing nights only and are reported for review.
+    clashes = (
+        RentNight.objects.filter(confirmed=True)
+        .values('rent_id', 'night')
+        .annotate(bookings=Count('id'))
+        .filter(bookings__gt=1)
+        .order_by()
+    )
+    reported = set()
+    for clash in clashes:
+        nights = RentNight.objects.filter(rent_id=clash['rent_id'], night=clash['night'], confirmed=True)
+        keep = nights.order_by('booking__created_at', 'booking_id').values_list('booking_id', flat=True)[0]
+        reported.update(nights.exclude(booking_id=keep).values_list('booking_id', flat=True))
+        nights.exclude(booking_id=keep).update(confirmed=None)
+
+    if reported:
+        print(
+            "\n  Confirmed bookings overlapping an older confirmed booking, please resolve: "
+            + ", ".join(str(pk) for pk in sorted(reported))
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0006_rentcalendar'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rentnight',
+            name='confirmed',
+            field=models.BooleanField(editable=False, null=True),
+        ),
+        migrations.RunPython(mark_confirmed_nights, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='rentnight',
+            constraint=models.UniqueConstraint(fields=('rent', 'night', 'confirmed'), name='rent_night_confirmed_unique'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:22
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def start_existing_holds(apps, schema_editor):
+    # Pending requests made before holds existed get a full hold from now on.
+    Booking = apps.get_model('booking', 'Booking')
+    ttl = getattr(settings, 'BOOKING_HOLD_TTL', None)
+    if ttl:
+        Booking.objects.filter(status='pending', hold_expires_at__isnull=True).update(
+            hold_expires_at=timezone.now() + ttl
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0007_rentnight_confirmed_lock'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='hold_expires_at',
+            field=models.DateTimeField(blank=True, help_text='A pending request stops reserving its dates at this time.', null=True),
+        ),
+        migrations.AlterField(
+            model_name='booking',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('confirmed', 'Confirmed'), ('cancelled', 'Cancelled'), ('expired', 'Expired')], default='pending', max_length=10),
+        ),
+        migrations.RunPython(start_existing_holds, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['status', 'hold_expires_at'], name='booking_hold_expiry_idx'),
+        ),
+    ]
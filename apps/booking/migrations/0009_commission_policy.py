@@ -0,0 +1,47 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:30
+
+from decimal import Decimal
+
+from django.db import migrations, models
+
+# The rates Booking.save applied before the policy table existed.
+INITIAL_RATES = {
+    'berlin': Decimal('0.25'),
+    'munich': Decimal('0.25'),
+    'hamburg': Decimal('0.25'),
+    'frankfurt': Decimal('0.25'),
+    'stuttgart': Decimal('0.25'),
+    '*': Decimal('0.15'),
+}
+
+
+def seed_policies(apps, schema_editor):
+    CommissionPolicy = apps.get_model('booking', 'CommissionPolicy')
+    CommissionPolicy.objects.bulk_create(
+        [CommissionPolicy(city_key=city_key, rate=rate) for city_key, rate in INITIAL_RATES.items()],
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0008_booking_hold_expiry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommissionPolicy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('city_key', models.CharField(help_text="Normalized city name as in Location.city_key, or '*' for the default rate", max_length=100, unique=True)),
+                ('rate', models.DecimalField(decimal_places=2, help_text='0.15 = 15%', max_digits=5)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'commission policies',
+                'ordering': ['city_key'],
+            },
+        ),
+        migrations.RunPython(seed_policies, migrations.RunPython.noop),
+    ]
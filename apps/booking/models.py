@@ -3,27 +3,40 @@ from decimal import Decimal
 from django.db import models
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 
 from apps.rent.models import Rent
 
-COMMISSION_BY_CITY = {
-    "Berlin": Decimal("0.25"),
-    "Munich": Decimal("0.25"),
-    "Hamburg": Decimal("0.20"),
-    "Cologne": Decimal("0.18"),
-    "Leipzig": Decimal("0.15"),
-    # default = 0.15
-}
-DEFAULT_COMMISSION = Decimal("0.15")
 
-def get_commission_rate(city: str) -> Decimal:
-    return COMMISSION_BY_CITY.get(city, Decimal("0.15"))
+class CommissionPolicy(models.Model):
+    """
+    Platform commission per city. The row with city_key '*' is the default
+    for every other city. Rates are cached by apps.booking.pricing.
+    """
+    DEFAULT_KEY = '*'
+
+    city_key = models.CharField(
+        max_length=100,
+        unique=True,
+        help_text="Normalized city name as in Location.city_key, or '*' for the default rate"
+    )
+    rate = models.DecimalField(max_digits=5, decimal_places=2, help_text="0.15 = 15%")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'commission policies'
+        ordering = ['city_key']
+
+    def __str__(self):
+        return f"{self.city_key}: {self.rate}"
+
 
 class Booking(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
         ('confirmed', 'Confirmed'),
         ('cancelled', 'Cancelled'),
+        ('expired', 'Expired'),
     ]
 
     renter = models.ForeignKey(
@@ -75,6 +88,12 @@ class Booking(models.Model):
 
     message = models.TextField(blank=True, help_text="Optional message or request from the renter")
 
+    hold_expires_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="A pending request stops reserving its dates at this time."
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -83,29 +102,101 @@ class Booking(models.Model):
         constraints = [
             models.CheckConstraint(check=models.Q(end_date__gt=models.F('start_date')), name='booking_dates_valid')
         ]
+        indexes = [
+            models.Index(fields=['status', 'hold_expires_at'], name='booking_hold_expiry_idx'),
+        ]
 
 
     def save(self, *args, **kwargs):
+        # The price is fixed when the stay is booked; later saves keep it
+        # unless the rent or the dates change.
+        if kwargs.get('update_fields') is None and self._stay_changed():
+            if not self.rent or self.rent.daily_price is None or self.rent.daily_price <= Decimal("0.00"):
+                raise ValidationError("Rent must have a valid daily price greater than 0.")
 
-        if not self.rent or self.rent.daily_price is None or self.rent.daily_price <= Decimal("0.00"):
-            raise ValidationError("Rent must have a valid daily price greater than 0.")
+            from apps.booking.pricing import quote  # pricing imports this module
 
-        nights = (self.end_date - self.start_date).days or 1
-        self.base_price = self.rent.daily_price * nights
+            price = quote(self.rent, self.start_date, self.end_date)
+            self.base_price = price.base_price
+            self.commission_percent = price.commission_rate
+            self.commission_amount = price.commission_amount
+            self.total_price = price.total_price
 
-        city = self.rent.location.city.lower() if self.rent.location and self.rent.location.city else ""
-        high_economy_cities = ['berlin', 'munich', 'hamburg', 'frankfurt', 'stuttgart']
+        super().save(*args, **kwargs)
 
-        self.commission_percent = Decimal("0.25") if city in high_economy_cities else Decimal("0.15")
-        self.commission_amount = self.base_price * self.commission_percent
-        self.total_price = self.base_price + self.commission_amount
+    def _stay_changed(self):
+        if self._state.adding or self.pk is None:
+            return True
+        stored = Booking.objects.filter(pk=self.pk).values_list('rent_id', 'start_date', 'end_date').first()
+        return stored != (self.rent_id, self.start_date, self.end_date)
 
-        super().save(*args, **kwargs)
 
+    @property
+    def hold_expired(self):
+        return (
+            self.status == 'pending'
+            and self.hold_expires_at is not None
+            and self.hold_expires_at <= timezone.now()
+        )
 
     def __str__(self):
         return f"Booking #{self.pk} by {self.renter.email} on {self.rent.title}"
 
+class RentNight(models.Model):
+    """
+    One row per night held by a pending or confirmed booking. Date-range
+    availability checks become a single range scan over (night, status)
+    instead of an overlap test per rent.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('confirmed', 'Confirmed'),
+    ]
+
+    rent = models.ForeignKey(Rent, on_delete=models.CASCADE, related_name='nights')
+    booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name='nights')
+    night = models.DateField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    # True for confirmed nights, NULL otherwise. Unique together with rent and
+    # night, so the database itself refuses a second confirmed booking of a
+    # night while any number of pending requests may overlap (NULLs never clash).
+    confirmed = models.BooleanField(null=True, editable=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['booking', 'night'], name='rent_night_booking_unique'),
+            models.UniqueConstraint(fields=['rent', 'night', 'confirmed'], name='rent_night_confirmed_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['night', 'status', 'rent'], name='rent_night_lookup_idx'),
+            models.Index(fields=['rent', 'night'], name='rent_night_rent_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.rent_id} {self.night} ({self.status})"
+
+
+class RentCalendar(models.Model):
+    """
+    Day bitmaps of one rent for one calendar year: bit n stands for day n of
+    the year (January 1st is bit 0). `booked` marks confirmed nights, `held`
+    nights only covered by pending requests. Rebuilt from RentNight whenever
+    a booking touching that year changes.
+    """
+    rent = models.ForeignKey(Rent, on_delete=models.CASCADE, related_name='calendars')
+    year = models.PositiveSmallIntegerField()
+    booked = models.BinaryField(max_length=46, default=bytes(46))
+    held = models.BinaryField(max_length=46, default=bytes(46))
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['rent', 'year'], name='rent_calendar_year_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.rent_id} {self.year}"
+
+
 class BookingLog(models.Model):
     ACTION_CHOICES = [
         ('create', 'Created'),
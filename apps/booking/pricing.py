@@ -0,0 +1,134 @@
+import threading
+import time
+from collections import namedtuple
+from decimal import Decimal, ROUND_HALF_UP
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, Max
+
+from apps.booking.models import CommissionPolicy
+from apps.rent.models import Rent
+
+# Every commission in the project is computed here from the CommissionPolicy
+# table. The rates are loaded once per process and kept in memory. At most
+# every CHECK_INTERVAL seconds a process compares the newest updated_at and
+# the row count of the table with what it loaded, and reloads on a change, so
+# edits made by any process reach all of them within that interval. A quote
+# therefore runs no queries of its own beyond the rent and location the
+# caller already has, apart from that periodic check.
+CHECK_INTERVAL = 5
+FALLBACK_RATE = Decimal("0.15")
+CENTS = Decimal("0.01")
+
+Quote = namedtuple('Quote', ['nights', 'base_price', 'commission_rate', 'commission_amount', 'total_price'])
+
+_lock = threading.Lock()
+_rates = None
+_stamp = None
+_checked_at = 0.0
+
+
+def _policy_stamp():
+    stamp = CommissionPolicy.objects.aggregate(changed=Max('updated_at'), rows=Count('id'))
+    return stamp['changed'], stamp['rows']
+
+
+def commission_rates():
+    """Return {city_key: rate}, reloading from the database only after a policy change."""
+    global _rates, _stamp, _checked_at
+
+    now = time.monotonic()
+    with _lock:
+        if _rates is not None and now - _checked_at < CHECK_INTERVAL:
+            return _rates
+        rates, stamp = _rates, _stamp
+
+    current = _policy_stamp()
+    if rates is None or current != stamp:
+        rates = dict(CommissionPolicy.objects.values_list('city_key', 'rate'))
+    with _lock:
+        _rates, _stamp, _checked_at = rates, current, now
+    return rates
+
+
+def invalidate_rates():
+    """Drop this process's copy; other processes notice the change on their next check."""
+    global _rates
+
+    with _lock:
+        _rates = None
+
+
+def invalidate_rates_on_commit():
+    transaction.on_commit(invalidate_rates)
+
+
+def commission_rate(city_key, rates=None):
+    rates = commission_rates() if rates is None else rates
+    return rates.get(city_key, rates.get(CommissionPolicy.DEFAULT_KEY, FALLBACK_RATE))
+
+
+def quote(rent, start_date, end_date, rates=None):
+    """
+    Price a stay of `rent` from `start_date` to `end_date`. Amounts are rounded
+    half up to cents. Pass `rates` from commission_rates() when quoting many
+    stays at once.
+    """
+    nights = (end_date - start_date).days or 1
+    base = ((rent.daily_price or Decimal("0")) * nights).quantize(CENTS, rounding=ROUND_HALF_UP)
+    city_key = rent.location.city_key if rent.location_id else ""
+    rate = commission_rate(city_key, rates)
+    commission = (base * rate).quantize(CENTS, rounding=ROUND_HALF_UP)
+    return Quote(nights, base, rate, commission, base + commission)
+
+
+def _cents(value):
+    return int((value * 100).to_integral_value())
+
+
+def _from_cents(values):
+    return [Decimal(int(value)).scaleb(-2) for value in values]
+
+
+def quote_many(stays):
+    """
+    Price many (rent_id, start_date, end_date) stays at once: one query loads
+    the rents and the amounts are computed as integer cents in numpy, giving
+    the same results as quote(). Returns a list aligned with `stays`, holding
+    None where the rent does not exist, is not bookable or has no price.
+    """
+    rent_ids = {rent_id for rent_id, _, _ in stays}
+    rents = {
+        rent_id: (daily_price, city_key)
+        for rent_id, daily_price, city_key in Rent.objects.filter(
+            pk__in=rent_ids, is_active=True, is_deleted=False, daily_price__gt=0
+        ).values_list('id', 'daily_price', 'location__city_key')
+    }
+    rates = commission_rates()
+
+    priced = [index for index, (rent_id, _, _) in enumerate(stays) if rent_id in rents]
+    results = [None] * len(stays)
+    if not priced:
+        return results
+
+    daily, nights, rate_pct, rate_values = [], [], [], []
+    for index in priced:
+        rent_id, start_date, end_date = stays[index]
+        daily_price, city_key = rents[rent_id]
+        rate = commission_rate(city_key or "", rates)
+        daily.append(_cents(daily_price))
+        nights.append((end_date - start_date).days or 1)
+        rate_pct.append(_cents(rate))
+        rate_values.append(rate)
+
+    nights = np.asarray(nights, dtype=np.int64)
+    base = np.asarray(daily, dtype=np.int64) * nights
+    # Rates have two decimals, so half-up rounding to cents is exact in integers.
+    commission = (base * np.asarray(rate_pct, dtype=np.int64) + 50) // 100
+    total = base + commission
+
+    columns = zip(nights.tolist(), _from_cents(base), rate_values, _from_cents(commission), _from_cents(total))
+    for index, (night_count, base_price, rate, commission_amount, total_price) in zip(priced, columns):
+        results[index] = Quote(night_count, base_price, rate, commission_amount, total_price)
+    return results
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from apps.booking.availability import free_windows, has_confirmed_overlap
 from apps.booking.models import Booking
 from datetime import date
 
@@ -6,31 +7,52 @@ class BookingSerializer(serializers.ModelSerializer):
     class Meta:
         model = Booking
         fields = '__all__'
-        read_only_fields = ['renter', 'commission_amount', 'created_at', 'updated_at']
+        read_only_fields = ['renter', 'commission_amount', 'hold_expires_at', 'created_at', 'updated_at']
 
     def validate(self, attrs):
-        rent = attrs['rent']
-        start_date = attrs['start_date']
-        end_date = attrs['end_date']
+        # Partial updates fall back to the booking's current values.
+        rent = attrs.get('rent', getattr(self.instance, 'rent', None))
+        start_date = attrs.get('start_date', getattr(self.instance, 'start_date', None))
+        end_date = attrs.get('end_date', getattr(self.instance, 'end_date', None))
 
         if start_date >= end_date:
             raise serializers.ValidationError("End date must be after start date.")
 
-        overlapping_bookings = Booking.objects.filter(
-            rent=rent,
-            status='confirmed',
-            start_date__lt=end_date,
-            end_date__gt=start_date,
-        )
-
-        if overlapping_bookings.exists():
-            raise serializers.ValidationError("This property is already booked for the selected dates.")
+        self.check_availability(rent, start_date, end_date)
 
         return attrs
 
 
+    def check_availability(self, rent, start_date, end_date):
+        if has_confirmed_overlap(rent.pk, start_date, end_date, exclude_booking=self.instance):
+            windows = free_windows(rent.pk, start_date, end_date)
+            raise serializers.ValidationError({
+                'non_field_errors': ["This property is already booked for the selected dates."],
+                'available_dates': [
+                    {'start_date': start.isoformat(), 'end_date': end.isoformat()} for start, end in windows
+                ],
+            })
+
     def validate_start_date(self, value):
         if value < date.today():
             raise serializers.ValidationError("Booking start date cannot be in the past.")
         return value
 
+
+
+BULK_QUOTE_MAX_ITEMS = 500
+
+
+class QuoteItemSerializer(serializers.Serializer):
+    rent = serializers.IntegerField(min_value=1)
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+
+    def validate(self, attrs):
+        if attrs['start_date'] >= attrs['end_date']:
+            raise serializers.ValidationError("End date must be after start date.")
+        return attrs
+
+
+class BulkQuoteSerializer(serializers.Serializer):
+    items = QuoteItemSerializer(many=True, allow_empty=False, max_length=BULK_QUOTE_MAX_ITEMS)
@@ -0,0 +1,42 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.booking.availability import nights_between, refresh_calendars, sync_booking_nights
+from apps.booking.models import Booking, CommissionPolicy
+from apps.booking.pricing import invalidate_rates_on_commit
+from apps.rent.cache import invalidate_on_commit
+
+
+NIGHT_FIELDS = ('rent_id', 'start_date', 'end_date', 'status')
+
+
+@receiver(pre_save, sender=Booking)
+def remember_booking_nights_state(sender, instance, raw, **kwargs):
+    instance._nights_state = None
+    if instance.pk and not raw:
+        instance._nights_state = Booking.objects.filter(pk=instance.pk).values(*NIGHT_FIELDS).first()
+
+
+@receiver(post_save, sender=Booking)
+def sync_nights_on_booking_save(sender, instance, raw, **kwargs):
+    if raw:
+        return
+    before = getattr(instance, '_nights_state', None)
+    if before is not None and all(before[field] == getattr(instance, field) for field in NIGHT_FIELDS):
+        return
+    refresh_calendars(sync_booking_nights(instance))
+    invalidate_on_commit()
+
+
+@receiver(post_delete, sender=Booking)
+def refresh_calendar_on_booking_delete(sender, instance, **kwargs):
+    # The booking's nights are already gone through the cascade.
+    nights = nights_between(instance.start_date, instance.end_date)
+    refresh_calendars({(instance.rent_id, night.year) for night in nights})
+    invalidate_on_commit()
+
+
+@receiver(post_save, sender=CommissionPolicy)
+@receiver(post_delete, sender=CommissionPolicy)
+def invalidate_commission_rates(sender, **kwargs):
+    invalidate_rates_on_commit()
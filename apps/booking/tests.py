@@ -0,0 +1,353 @@
+import threading
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock, skipUnless
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient, APITestCase
+from rest_framework.throttling import ScopedRateThrottle
+
+from apps.booking.availability import lock_rent
+from apps.booking.holds import expire_holds
+from apps.booking import pricing
+from apps.booking.models import Booking, CommissionPolicy, RentNight
+from apps.location.models import Location
+from apps.notifications.models import OutboxMessage
+from apps.rent.models import Rent
+from apps.users.models import User
+
+
+class BookingTestMixin:
+
+    def setUp(self):
+        self.host = User.objects.create_user(
+            email="host@example.com", full_name="Host", password="pass12345", is_host=True
+        )
+        self.renter = User.objects.create_user(
+            email="renter@example.com", full_name="Renter", password="pass12345"
+        )
+        location = Location.objects.create(city="Berlin", district="Mitte", latitude=52.52, longitude=13.405)
+        self.rent = Rent.objects.create(
+            owner=self.host,
+            location=location,
+            title="Listing",
+            description="Bright flat",
+            rooms=2,
+            property_type="STUDIO",
+            is_daily_available=True,
+            daily_price=Decimal("50.00"),
+        )
+        self.day = date.today() + timedelta(days=30)
+
+    def book(self, start, nights, status="confirmed"):
+        return Booking.objects.create(
+            renter=self.renter, rent=self.rent, status=status,
+            start_date=self.day + timedelta(days=start),
+            end_date=self.day + timedelta(days=start + nights),
+        )
+
+
+class BookingConflictSuggestionTests(BookingTestMixin, APITestCase):
+
+    def test_conflict_returns_nearest_free_windows(self):
+        self.book(0, 3)
+        self.book(5, 2)
+        self.book(9, 4)
+        self.book(3, 1, status="pending")
+
+        self.client.force_authenticate(self.renter)
+        response = self.client.post(reverse("booking-list"), {
+            "rent": self.rent.pk,
+            "start_date": self.day + timedelta(days=5),
+            "end_date": self.day + timedelta(days=7),
+        })
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("non_field_errors", response.data)
+        offsets = [
+            ((date.fromisoformat(window["start_date"]) - self.day).days,
+             (date.fromisoformat(window["end_date"]) - self.day).days)
+            for window in response.data["available_dates"]
+        ]
+        self.assertEqual(offsets, [(3, 5), (7, 9), (-2, 0)])
+
+
+class BookingHoldExpiryTests(BookingTestMixin, APITestCase):
+
+    def test_expired_holds_are_swept_in_batches_and_free_their_dates(self):
+        now = timezone.now()
+        stale = [self.book(index * 3, 2, status="pending") for index in range(3)]
+        fresh = self.book(20, 2, status="pending")
+        Booking.objects.filter(pk__in=[b.pk for b in stale]).update(hold_expires_at=now - timedelta(minutes=1))
+        Booking.objects.filter(pk=fresh.pk).update(hold_expires_at=now + timedelta(hours=1))
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(expire_holds(now=now, batch_size=2), 3)
+
+        booking_update = f"UPDATE {connection.ops.quote_name(Booking._meta.db_table)}"
+        self.assertEqual(sum(q["sql"].startswith(booking_update) for q in ctx.captured_queries), 2)
+
+        self.assertEqual(Booking.objects.filter(status="expired").count(), 3)
+        self.assertEqual(Booking.objects.get(pk=fresh.pk).status, "pending")
+        self.assertEqual(set(RentNight.objects.values_list("booking_id", flat=True)), {fresh.pk})
+        self.assertEqual(OutboxMessage.objects.filter(kind="booking_expired").count(), 3)
+
+    def test_host_cannot_confirm_an_expired_hold(self):
+        booking = self.book(0, 2, status="pending")
+        Booking.objects.filter(pk=booking.pk).update(hold_expires_at=timezone.now() - timedelta(seconds=1))
+
+        self.client.force_authenticate(self.host)
+        response = self.client.post(reverse("booking-confirm-booking", args=[booking.pk]))
+        self.assertEqual(response.status_code, 400)
+
+
+class BookingConfirmationTests(BookingTestMixin, APITestCase):
+
+    def test_confirm_declines_overlapping_requests_in_one_update(self):
+        winner = self.book(0, 4, status="pending")
+        losers = [self.book(start, 2, status="pending") for start in (1, 2, 3)]
+        untouched = self.book(4, 2, status="pending")
+
+        self.client.force_authenticate(self.host)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(reverse("booking-confirm-booking", args=[winner.pk]))
+        self.assertEqual(response.status_code, 200)
+
+        booking_update = f"UPDATE {connection.ops.quote_name(Booking._meta.db_table)}"
+        declines = [q for q in ctx.captured_queries if q["sql"].startswith(booking_update) and "cancelled" in q["sql"]]
+        self.assertEqual(len(declines), 1)
+
+        self.assertEqual(
+            set(Booking.objects.filter(status="cancelled").values_list("pk", flat=True)), {b.pk for b in losers}
+        )
+        self.assertEqual(set(RentNight.objects.values_list("booking_id", flat=True)), {winner.pk, untouched.pk})
+        self.assertEqual(OutboxMessage.objects.filter(kind="booking_declined").count(), 3)
+        self.assertEqual(OutboxMessage.objects.filter(kind="booking_confirmed").count(), 1)
+
+    def test_constraint_conflict_is_reported_as_409(self):
+        self.book(0, 3)
+        pending = self.book(2, 2, status="pending")
+
+        self.client.force_authenticate(self.host)
+        with mock.patch("apps.booking.views.has_confirmed_overlap", return_value=False):
+            response = self.client.post(reverse("booking-confirm-booking", args=[pending.pk]))
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Booking.objects.get(pk=pending.pk).status, "pending")
+
+    def test_update_cannot_move_onto_confirmed_nights(self):
+        self.book(0, 3)
+        moved = self.book(5, 2)
+        url = reverse("booking-detail", args=[moved.pk])
+        dates = {"start_date": self.day + timedelta(days=2), "end_date": self.day + timedelta(days=4)}
+
+        self.client.force_authenticate(self.renter)
+        self.assertEqual(self.client.patch(url, dates).status_code, 400)
+        with mock.patch("apps.booking.serializers.has_confirmed_overlap", return_value=False):
+            self.assertEqual(self.client.patch(url, dates).status_code, 409)
+        self.assertEqual(Booking.objects.get(pk=moved.pk).start_date, self.day + timedelta(days=5))
+
+
+class CommissionPricingTests(BookingTestMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        CommissionPolicy.objects.create(city_key="berlin", rate=Decimal("0.25"))
+        CommissionPolicy.objects.create(city_key="*", rate=Decimal("0.15"))
+        pricing.invalidate_rates()
+        self.addCleanup(pricing.invalidate_rates)
+
+    def test_booking_and_payment_use_the_city_policy(self):
+        booking = self.book(0, 3, status="pending")
+        self.assertEqual(
+            (booking.base_price, booking.commission_percent, booking.commission_amount, booking.total_price),
+            (Decimal("150.00"), Decimal("0.25"), Decimal("37.50"), Decimal("187.50")),
+        )
+
+        self.client.force_authenticate(self.host)
+        self.client.post(reverse("booking-confirm-booking", args=[booking.pk]))
+        self.assertEqual(booking.payment.commission_amount, Decimal("37.50"))
+
+    def test_quotes_are_served_from_memory_until_the_policy_changes(self):
+        self.rent.daily_price = Decimal("33.33")
+        pricing.commission_rates()
+        with self.assertNumQueries(0):
+            price = pricing.quote(self.rent, self.day, self.day + timedelta(days=1))
+        self.assertEqual(price.commission_amount, Decimal("8.33"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CommissionPolicy.objects.filter(city_key="berlin").update(rate=Decimal("0.20"))
+            CommissionPolicy.objects.get(city_key="berlin").save()
+        self.assertEqual(pricing.quote(self.rent, self.day, self.day + timedelta(days=3)).commission_amount, Decimal("20.00"))
+
+    def test_policy_changes_reach_new_quotes_but_not_existing_bookings(self):
+        booking = self.book(0, 3, status="pending")
+        pricing.commission_rates()
+
+        # Another process edits the policy: this one only learns about it from the table.
+        with mock.patch("apps.booking.signals.invalidate_rates_on_commit"):
+            policy = CommissionPolicy.objects.get(city_key="berlin")
+            policy.rate = Decimal("0.10")
+            policy.save()
+        self.assertEqual(pricing.quote(self.rent, self.day, self.day + timedelta(days=3)).commission_amount, Decimal("37.50"))
+
+        later = time.monotonic() + pricing.CHECK_INTERVAL + 1
+        with mock.patch("apps.booking.pricing.time.monotonic", return_value=later):
+            self.assertEqual(pricing.quote(self.rent, self.day, self.day + timedelta(days=3)).commission_amount, Decimal("15.00"))
+
+            self.client.force_authenticate(self.host)
+            self.assertEqual(self.client.post(reverse("booking-confirm-booking", args=[booking.pk])).status_code, 200)
+            self.assertEqual(self.book(10, 3).commission_amount, Decimal("15.00"))
+
+        booking.refresh_from_db()
+        self.assertEqual((booking.status, booking.commission_amount), ("confirmed", Decimal("37.50")))
+        self.assertEqual(booking.payment.commission_amount, Decimal("37.50"))
+
+
+class BulkQuoteTests(BookingTestMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_quotes_match_booking_prices(self):
+        CommissionPolicy.objects.create(city_key="berlin", rate=Decimal("0.25"))
+        pricing.invalidate_rates()
+        self.addCleanup(pricing.invalidate_rates)
+        self.rent.daily_price = Decimal("33.33")
+        self.rent.save()
+
+        items = [
+            {"rent": self.rent.pk, "start_date": str(self.day), "end_date": str(self.day + timedelta(days=nights))}
+            for nights in range(1, 8)
+        ]
+        items.append({"rent": 999999, "start_date": str(self.day), "end_date": str(self.day + timedelta(days=1))})
+
+        pricing.commission_rates()
+        with self.assertNumQueries(1):
+            response = self.client.post(reverse("booking-quote"), {"items": items}, format="json")
+        self.assertEqual(response.status_code, 200)
+
+        results = response.data["results"]
+        self.assertEqual(results[-1]["error"], "Rent not found, not available or has no daily price.")
+        for nights, result in enumerate(results[:-1], start=1):
+            booking = self.book(nights * 10, nights, status="pending")
+            self.assertEqual(
+                (result["base_price"], result["commission_amount"], result["total_price"]),
+                (str(booking.base_price), str(booking.commission_amount), str(booking.total_price)),
+            )
+
+    def test_item_limit(self):
+        item = {"rent": self.rent.pk, "start_date": str(self.day), "end_date": str(self.day + timedelta(days=1))}
+        response = self.client.post(reverse("booking-quote"), {"items": [item] * 501}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_inactive_rents_are_not_quoted(self):
+        Rent.objects.filter(pk=self.rent.pk).update(is_active=False)
+        item = {"rent": self.rent.pk, "start_date": str(self.day), "end_date": str(self.day + timedelta(days=1))}
+        response = self.client.post(reverse("booking-quote"), {"items": [item]}, format="json")
+        self.assertIn("error", response.data["results"][0])
+
+    def test_requests_are_throttled(self):
+        item = {"rent": self.rent.pk, "start_date": str(self.day), "end_date": str(self.day + timedelta(days=1))}
+        with mock.patch.dict(ScopedRateThrottle.THROTTLE_RATES, {"booking-quote": "2/min"}):
+            statuses = [
+                self.client.post(reverse("booking-quote"), {"items": [item]}, format="json").status_code
+                for _ in range(3)
+            ]
+        self.assertEqual(statuses, [200, 200, 429])
+
+
+def serializes_booking_writes():
+    """Row locks, or SQLite opening every transaction with BEGIN IMMEDIATE."""
+    options = connection.settings_dict.get("OPTIONS", {})
+    return connection.features.has_select_for_update or options.get("transaction_mode") == "IMMEDIATE"
+
+
+@skipUnless(serializes_booking_writes(), "needs row locks or IMMEDIATE SQLite transactions")
+class ConcurrentBookingTests(BookingTestMixin, TransactionTestCase):
+    """
+    Hold the rent lock in one request while a second one races for the same
+    nights, so the interleaving is fixed instead of left to the scheduler.
+    """
+
+    def hold_lock_during(self, first, second):
+        locked, release = threading.Event(), threading.Event()
+        calls = []
+
+        def pausing_lock(rent_id):
+            lock_rent(rent_id)
+            calls.append(rent_id)
+            if len(calls) == 1:
+                locked.set()
+                release.wait(10)
+
+        statuses = {}
+
+        def worker(name, request):
+            try:
+                statuses[name] = request(APIClient()).status_code
+            finally:
+                connection.close()
+
+        with mock.patch("apps.booking.views.lock_rent", pausing_lock):
+            holder = threading.Thread(target=worker, args=("first", first))
+            holder.start()
+            self.assertTrue(locked.wait(10))
+
+            waiter = threading.Thread(target=worker, args=("second", second))
+            waiter.start()
+            waiter.join(0.5)
+            self.assertTrue(waiter.is_alive(), "the second request did not wait for the rent lock")
+
+            release.set()
+            holder.join(10)
+            waiter.join(10)
+        return statuses["first"], statuses["second"]
+
+    def confirm(self, booking):
+        def request(client):
+            client.force_authenticate(self.host)
+            return client.post(reverse("booking-confirm-booking", args=[booking.pk]))
+        return request
+
+    def assert_no_double_booking(self):
+        confirmed = list(Booking.objects.filter(rent=self.rent, status="confirmed").order_by("start_date"))
+        for earlier, later in zip(confirmed, confirmed[1:]):
+            self.assertLessEqual(earlier.end_date, later.start_date)
+        nights = RentNight.objects.filter(rent=self.rent, confirmed=True)
+        self.assertEqual(nights.count(), nights.values("night").distinct().count())
+
+    def test_concurrent_confirmations_of_overlapping_requests(self):
+        winner = self.book(0, 3, status="pending")
+        loser = self.book(1, 3, status="pending")
+
+        statuses = self.hold_lock_during(self.confirm(winner), self.confirm(loser))
+
+        self.assertEqual(statuses, (200, 400))
+        self.assertEqual(Booking.objects.get(pk=winner.pk).status, "confirmed")
+        self.assertEqual(Booking.objects.get(pk=loser.pk).status, "cancelled")
+        self.assert_no_double_booking()
+
+    def test_concurrent_request_against_a_fresh_confirmation(self):
+        pending = self.book(0, 3, status="pending")
+
+        def create(client):
+            client.force_authenticate(self.renter)
+            return client.post(reverse("booking-list"), {
+                "rent": self.rent.pk,
+                "start_date": self.day + timedelta(days=1),
+                "end_date": self.day + timedelta(days=2),
+            })
+
+        statuses = self.hold_lock_during(self.confirm(pending), create)
+
+        self.assertEqual(statuses, (200, 400))
+        self.assertEqual(Booking.objects.get(pk=pending.pk).status, "confirmed")
+        self.assertEqual(Booking.objects.count(), 1)
+        self.assert_no_double_booking()
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from apps.booking.views import BookingViewSet, MyBookingsView, AdminHostStatsView
+from apps.booking.views import BookingViewSet, BulkQuoteView, MyBookingsView, AdminHostStatsView
 
 router = DefaultRouter()
 router.register(r'bookings', BookingViewSet, basename='booking')
@@ -8,5 +8,6 @@ router.register(r'bookings', BookingViewSet, basename='booking')
 urlpatterns = [
     path('', include(router.urls)),
     path('my/', MyBookingsView.as_view(), name='my-bookings'),
+    path('quote/', BulkQuoteView.as_view(), name='booking-quote'),
     path("admin/host-stats/", AdminHostStatsView.as_view(), name="admin-host-stats"),
 ]
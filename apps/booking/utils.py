@@ -1,4 +1,10 @@
+from django.utils import timezone
+
+from apps.notifications import outbox
+
+
 def send_booking_notification(booking, to_host=True, cancelled=False):
+    """Queue the message in the outbox and return its text. Call it inside the booking's transaction."""
     title = booking.rent.title
     start = booking.start_date.strftime("%d %b %Y")
     end = booking.end_date.strftime("%d %b %Y")
@@ -29,6 +35,38 @@ def send_booking_notification(booking, to_host=True, cancelled=False):
             f"Host: {booking.rent.owner.full_name} ({booking.rent.owner.email})"
         )
 
-    print(message)
+    if cancelled:
+        outbox.add('booking_declined', booking.renter.email, f"Your request for '{title}' was declined", message)
+    elif to_host:
+        outbox.add_host_event(
+            'booking_requested', booking.rent.owner.email, f"New booking for '{title}'", message,
+            title=title, start=start, end=end, renter=booking.renter.full_name, renter_email=booking.renter.email,
+        )
+    else:
+        outbox.add('booking_confirmed', booking.renter.email, f"Your booking for '{title}' is confirmed", message)
+    return message
+
+
+def send_booking_pending_notification(booking):
+    message = (
+        f"Dear {booking.renter.full_name},\n\n"
+        f"The booking request for '{booking.rent.title}' from {booking.start_date} to {booking.end_date} "
+        f"has been received and is currently **pending**.\n"
+        f"These dates are now temporarily reserved for you until the host takes action "
+        f"or until {timezone.localtime(booking.hold_expires_at):%d %b %Y %H:%M}, whichever comes first.\n\n"
+        f"Thank you for using our platform!"
+    )
+    outbox.add('booking_pending', booking.renter.email, f"Your request for '{booking.rent.title}' is pending", message)
     return message
 
+
+def send_hold_expired_notification(booking):
+    message = (
+        f"[To Renter: {booking.renter.email}]\n"
+        f"Dear {booking.renter.full_name},\n\n"
+        f"Your request for '{booking.rent.title}' from {booking.start_date:%d %b %Y} to {booking.end_date:%d %b %Y} "
+        f"was not confirmed in time and has expired.\n"
+        f"The dates are no longer reserved for you, but you are welcome to send a new request."
+    )
+    outbox.add('booking_expired', booking.renter.email, f"Your request for '{booking.rent.title}' expired", message)
+    return message
@@ -3,20 +3,27 @@ from datetime import date, timedelta
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
-from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.exceptions import APIException, PermissionDenied, ValidationError
 from rest_framework.generics import ListAPIView
-from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
+from rest_framework.throttling import ScopedRateThrottle
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.views import APIView
 
 from apps.booking import models
+from apps.booking.availability import has_confirmed_overlap, lock_rent, release_pending
+from apps.booking.holds import hold_deadline
 from apps.booking.models import Booking, BookingLog
 from apps.booking.permissions import IsBookingOwnerOrAdmin, IsBookingRelatedOrAdmin
-from apps.booking.serializers import BookingSerializer
-from apps.booking.utils import send_booking_notification
+from apps.booking.pricing import quote, quote_many
+from apps.booking.serializers import BookingSerializer, BulkQuoteSerializer
+from apps.booking.utils import send_booking_notification, send_booking_pending_notification
+from apps.rent.trending import record_booking
 
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, OperationalError, transaction
 from django.db.models import Q, Count, Avg
 
 from decimal import Decimal
@@ -28,6 +35,12 @@ from apps.rent.models import Rent
 from apps.users.models import User
 
 
+class DatesTaken(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "These dates have already been confirmed for another booking."
+    default_code = 'dates_taken'
+
+
 class BookingViewSet(viewsets.ModelViewSet):
     serializer_class = BookingSerializer
     permission_classes = [IsAuthenticated, IsBookingRelatedOrAdmin]
@@ -86,39 +99,48 @@ class BookingViewSet(viewsets.ModelViewSet):
       #  if conflict:
       #      raise ValidationError("These dates are already booked or temporarily reserved by another user.")
 
-        booking = serializer.save(
-            renter=self.request.user,
-            commission_amount=commission,
-            status='pending'
-        )
-
-
-        host_msg = send_booking_notification(booking, to_host=True)
-        renter_msg = send_booking_notification(booking, to_host=False)
+        # validate() already checked the dates, but only the check made while
+        # holding the rent lock is reliable under concurrent requests.
+        with transaction.atomic():
+            lock_rent(rent.pk)
+            serializer.check_availability(rent, start_date, end_date)
+            booking = serializer.save(
+                renter=self.request.user,
+                commission_amount=commission,
+                status='pending',
+                hold_expires_at=hold_deadline(),
+            )
+            # Trending is best effort: run it after commit and only log failures.
+            transaction.on_commit(lambda: record_booking(rent.pk), robust=True)
+            host_msg = send_booking_notification(booking, to_host=True)
+            renter_msg = send_booking_pending_notification(booking)
 
         self.created_booking = booking
         self.host_msg = host_msg
         self.renter_msg = renter_msg
 
-        message = (
-            f"Dear {booking.renter.full_name},\n\n"
-            f"The booking request for '{booking.rent.title}' from {booking.start_date} to {booking.end_date} "
-            f"has been received and is currently **pending**.\n"
-            f"These dates are now marked as temporarily reserved until the host takes action.\n\n"
-            f"Thank you for using our platform!"
-        )
-        print(f"[Notification to renter] {message}")
+    def perform_update(self, serializer):
+        booking = serializer.instance
+        rent = serializer.validated_data.get('rent', booking.rent)
+        start_date = serializer.validated_data.get('start_date', booking.start_date)
+        end_date = serializer.validated_data.get('end_date', booking.end_date)
 
-        self.created_message = message
+        try:
+            with transaction.atomic():
+                # Lock both rents in id order when a booking moves between them.
+                for rent_id in sorted({booking.rent_id, rent.pk}):
+                    lock_rent(rent_id)
+                serializer.check_availability(rent, start_date, end_date)
+                serializer.save()
+        except IntegrityError:
+            raise DatesTaken()
 
     def calculate_commission(self, rent, start_date, end_date):
-        total_days = (end_date - start_date).days or 1
-        daily_price = rent.daily_price or Decimal("0")
-        return round(daily_price * Decimal(total_days) * Decimal("0.1"), 2)
+        return quote(rent, start_date, end_date).commission_amount
 
     @swagger_auto_schema(
         operation_summary="Create a booking",
-        operation_description="Creates a booking and automatically calculates a 10% commission fee.",
+        operation_description="Creates a booking and calculates the commission for the listing's city.",
         request_body=BookingSerializer,
         responses={201: BookingSerializer()},
     )
@@ -139,31 +161,48 @@ class BookingViewSet(viewsets.ModelViewSet):
             return Response({"detail": "Only the host or admin can confirm this booking."},
                             status=status.HTTP_403_FORBIDDEN)
 
-        if booking.status != "pending":
-            return Response({"detail": "Booking is not in pending state."}, status=status.HTTP_400_BAD_REQUEST)
-
         try:
-            process_payment_for_booking(booking)
-            booking.refresh_from_db()
-        except Exception as e:
-            return Response(
-                {"detail": f"Payment creation failed: {str(e)}"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-
-        overlapping_pending = Booking.objects.filter(
-            rent=booking.rent,
-            status="pending",
-            start_date__lt=booking.end_date,
-            end_date__gt=booking.start_date
-        ).exclude(pk=booking.pk)
-
-        for b in overlapping_pending:
-            b.status = "cancelled"
-            b.save()
-            send_booking_notification(b, to_host=False, cancelled=True)
-
-        send_booking_notification(booking, to_host=False)
+            with transaction.atomic():
+                lock_rent(booking.rent_id)
+                # Lock the booking row as well: the hold sweeper skips locked
+                # rows, so it cannot expire the booking while it is confirmed.
+                booking = Booking.objects.select_for_update().get(pk=booking.pk)
+
+                if booking.status != "pending":
+                    return Response({"detail": "Booking is not in pending state."},
+                                    status=status.HTTP_400_BAD_REQUEST)
+                if booking.hold_expired:
+                    return Response({"detail": "The hold on these dates has expired."},
+                                    status=status.HTTP_400_BAD_REQUEST)
+                if has_confirmed_overlap(booking.rent_id, booking.start_date, booking.end_date):
+                    return Response({"detail": "These dates have already been confirmed for another booking."},
+                                    status=status.HTTP_409_CONFLICT)
+
+                process_payment_for_booking(booking)
+                booking.refresh_from_db()
+
+                declined_ids = list(Booking.objects.filter(
+                    rent_id=booking.rent_id,
+                    status="pending",
+                    start_date__lt=booking.end_date,
+                    end_date__gt=booking.start_date
+                ).exclude(pk=booking.pk).values_list("pk", flat=True))
+                release_pending(declined_ids, "cancelled")
+
+                declined = Booking.objects.select_related("renter", "rent").filter(pk__in=declined_ids).order_by()
+                for b in declined:
+                    send_booking_notification(b, to_host=False, cancelled=True)
+                send_booking_notification(booking, to_host=False)
+        except IntegrityError:
+            # The confirmed-nights constraint caught a conflict the lock did not.
+            return Response({"detail": DatesTaken.default_detail}, status=status.HTTP_409_CONFLICT)
+        except OperationalError:
+            # Lock wait timeout or deadlock: nothing was written, the host can retry.
+            return Response({"detail": "The listing is busy, please try again."},
+                            status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        except DjangoValidationError as e:
+            return Response({"detail": f"Payment creation failed: {' '.join(e.messages)}"},
+                            status=status.HTTP_400_BAD_REQUEST)
 
         return Response(
             {"detail": "Booking confirmed and payment recorded. Other pending bookings have been declined."},
@@ -185,9 +224,9 @@ class BookingViewSet(viewsets.ModelViewSet):
                 return
 
             if days_before >= 3:
-                commission = self.calculate_commission(instance.rent, instance.start_date, instance.end_date)
+                commission = instance.commission_amount
                 instance.delete()
-                raise PermissionDenied(f"Booking canceled. 10% commission: {commission}€ will be withheld.")
+                raise PermissionDenied(f"Booking canceled. Commission of {commission}€ will be withheld.")
             else:
                 raise PermissionDenied("You can cancel only at least 3 days in advance.")
 
@@ -225,10 +264,10 @@ class BookingViewSet(viewsets.ModelViewSet):
                 payment.is_refunded = False
                 payment.save()
 
-        booking.status = "cancelled"
-        booking.save()
-
-        send_booking_notification(booking, to_host=False, cancelled=True)
+        with transaction.atomic():
+            booking.status = "cancelled"
+            booking.save()
+            send_booking_notification(booking, to_host=False, cancelled=True)
 
         return Response({"detail": "Booking cancelled successfully."}, status=status.HTTP_200_OK)
 
@@ -247,7 +286,7 @@ class MyBookingsView(ListAPIView):
         manual_parameters=[
             openapi.Parameter(
                 'status', openapi.IN_QUERY, description="Filter by booking status",
-                type=openapi.TYPE_STRING, enum=['pending', 'confirmed', 'cancelled']
+                type=openapi.TYPE_STRING, enum=['pending', 'confirmed', 'cancelled', 'expired']
             ),
             openapi.Parameter(
                 'start_date', openapi.IN_QUERY, description="Filter by start date (YYYY-MM-DD)",
@@ -289,4 +328,43 @@ class AdminHostStatsView(APIView):
         return Response(data)
 
 
+class BulkQuoteView(APIView):
+    permission_classes = [AllowAny]
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'booking-quote'
 
+    @swagger_auto_schema(
+        operation_summary="Price many stays at once",
+        operation_description=(
+            "Returns base price, commission and total for up to 500 (rent, start_date, end_date) items, "
+            "using the same rules as booking creation. Items whose rent does not exist or has no price "
+            "come back with an `error` instead of amounts. Rate limited per user or IP."
+        ),
+        request_body=BulkQuoteSerializer,
+    )
+    def post(self, request):
+        serializer = BulkQuoteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data['items']
+
+        quotes = quote_many([(item['rent'], item['start_date'], item['end_date']) for item in items])
+
+        results = []
+        for item, price in zip(items, quotes):
+            result = {
+                "rent": item['rent'],
+                "start_date": item['start_date'].isoformat(),
+                "end_date": item['end_date'].isoformat(),
+            }
+            if price is None:
+                result["error"] = "Rent not found, not available or has no daily price."
+            else:
+                result.update({
+                    "nights": price.nights,
+                    "base_price": str(price.base_price),
+                    "commission_rate": str(price.commission_rate),
+                    "commission_amount": str(price.commission_amount),
+                    "total_price": str(price.total_price),
+                })
+            results.append(result)
+        return Response({"results": results})
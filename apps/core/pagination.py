@@ -0,0 +1,179 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Keyset ("seek") pagination for querysets ordered by one of `keyset_fields`
+    with `id` as tie-breaker. Each page is read with a `WHERE (key, id) > cursor`
+    condition instead of OFFSET and no COUNT(*) is run, so deep pages cost the
+    same as the first one when a matching index exists.
+
+    NULL keys sort as the smallest values (first ascending, last descending),
+    which is what MySQL and SQLite do natively.
+
+    Keyset paging is opt-in: only requests carrying `cursor` (empty for the
+    first page) use it. Everything else, and querysets ordered any other way,
+    gets plain page-number pagination with `count`, so existing clients keep
+    working.
+    """
+    cursor_query_param = 'cursor'
+    keyset_fields = ('created_at', 'daily_price', 'id')
+    invalid_cursor_message = 'Invalid cursor.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.keyset = None
+        if self.cursor_query_param in request.query_params:
+            self.keyset = self.get_keyset(queryset)
+        if self.keyset is None:
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        name, descending = self.keyset
+        cursor = self.decode_cursor(request, queryset.model)
+        reverse = cursor is not None and cursor[2]
+
+        queryset = queryset.order_by(*self.ordering(name, descending != reverse))
+        if cursor is not None:
+            queryset = queryset.filter(self.after(queryset.model, name, cursor[0], cursor[1], descending != reverse))
+
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        self.next_position = self.previous_position = None
+        if rows:
+            if has_more or reverse:
+                self.next_position = self.position(rows[-1], name)
+            if cursor is not None and (has_more or not reverse):
+                self.previous_position = self.position(rows[0], name)
+        return rows
+
+    def get_paginated_response(self, data):
+        if self.keyset is None:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_next_link(self):
+        if self.keyset is None:
+            return super().get_next_link()
+        return self.cursor_link(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if self.keyset is None:
+            return super().get_previous_link()
+        return self.cursor_link(self.previous_position, reverse=True)
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [{
+            'name': self.cursor_query_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Cursor from the `next`/`previous` link.',
+            'schema': {'type': 'string'},
+        }]
+
+    def get_keyset(self, queryset):
+        """Return (field name, descending) when the queryset ordering supports keyset paging."""
+        query = getattr(queryset, 'query', None)
+        if query is None or query.is_sliced:
+            return None
+
+        ordering = list(query.order_by)
+        if not ordering and query.default_ordering:
+            ordering = list(queryset.model._meta.ordering)
+        if not ordering or len(ordering) > 2 or not all(isinstance(item, str) for item in ordering):
+            return None
+
+        descending = ordering[0].startswith('-')
+        name = ordering[0].lstrip('-')
+        name = 'id' if name == 'pk' else name
+        if name not in self.keyset_fields:
+            return None
+        if len(ordering) == 2 and ordering[1] not in (('-id', '-pk') if descending else ('id', 'pk')):
+            return None
+
+        try:
+            queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+        return name, descending
+
+    @staticmethod
+    def ordering(name, descending):
+        if name == 'id':
+            return ['-id' if descending else 'id']
+        if descending:
+            return [F(name).desc(nulls_last=True), '-id']
+        return [F(name).asc(nulls_first=True), 'id']
+
+    @staticmethod
+    def after(model, name, value, pk, descending):
+        """Match rows strictly after (value, pk) in the given direction."""
+        if name == 'id':
+            return Q(id__lt=pk) if descending else Q(id__gt=pk)
+
+        nullable = model._meta.get_field(name).null
+        op = 'lt' if descending else 'gt'
+        if value is None:
+            q = Q(**{f'{name}__isnull': True, f'id__{op}': pk})
+            return q if descending else q | Q(**{f'{name}__isnull': False})
+
+        q = Q(**{f'{name}__{op}': value}) | Q(**{name: value, f'id__{op}': pk})
+        if descending and nullable:
+            q |= Q(**{f'{name}__isnull': True})
+        return q
+
+    @staticmethod
+    def position(item, name):
+        if isinstance(item, dict):
+            return item[name], item['id']
+        return getattr(item, name), item.pk
+
+    def cursor_link(self, position, reverse):
+        if position is None:
+            return None
+        value, pk = position
+        name, descending = self.keyset
+        if value is not None and name != 'id':
+            value = value.isoformat() if hasattr(value, 'isoformat') else str(value)
+        payload = json.dumps([name, descending, value, pk, reverse], separators=(',', ':'))
+        token = base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request, model):
+        """Return (value, pk, reverse) from the request cursor, or None on the first page."""
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+
+        try:
+            payload = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+            name, descending, value, pk, reverse = json.loads(payload)
+            if (name, descending) != self.keyset or not isinstance(pk, int):
+                raise ValueError
+            if value is not None:
+                value = model._meta.get_field(name).to_python(value)
+        except (binascii.Error, TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return value, pk, bool(reverse)
@@ -0,0 +1,50 @@
+import numpy as np
+
+# Mean Earth radius (IUGG) in km.
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat, lng, latitudes, longitudes):
+    """
+    Great-circle distances in km from (lat, lng) to every point of the
+    `latitudes`/`longitudes` sequences, computed in one vectorized pass.
+    """
+    lat1 = np.radians(lat)
+    lat2 = np.radians(np.asarray(latitudes, dtype=np.float64))
+    d_lat = lat2 - lat1
+    d_lng = np.radians(np.asarray(longitudes, dtype=np.float64) - lng)
+
+    a = np.sin(d_lat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(d_lng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def distances_from(lat, lng, rows):
+    """
+    Take (id, latitude, longitude) rows, e.g. from `values_list`, and return
+    a pair of arrays: ids and their distances in km from (lat, lng).
+    """
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+    ids, latitudes, longitudes = zip(*rows)
+    return np.asarray(ids, dtype=np.int64), haversine_km(lat, lng, latitudes, longitudes)
+
+
+def ids_within(lat, lng, rows, radius_km):
+    """Return the ids of (id, latitude, longitude) rows within radius_km of (lat, lng)."""
+    ids, distances = distances_from(lat, lng, rows)
+    return ids[distances <= radius_km].tolist()
+
+
+def ids_by_distance(lat, lng, rows, limit=None):
+    """
+    Return (id, distance_km) pairs sorted nearest first, optionally keeping
+    only the `limit` closest ones.
+    """
+    ids, distances = distances_from(lat, lng, rows)
+    if limit is not None and limit < len(ids):
+        nearest = np.argpartition(distances, limit)[:limit]
+        order = nearest[np.argsort(distances[nearest], kind='stable')]
+    else:
+        order = np.argsort(distances, kind='stable')
+    return list(zip(ids[order].tolist(), distances[order].tolist()))
@@ -0,0 +1,137 @@
+import math
+
+from django.db.models import Q
+
+from apps.location import geohash
+from apps.location.distance import ids_by_distance
+
+# Shortest length of one degree of latitude on the WGS-84 ellipsoid (at the equator)
+# and the longest length of one degree of longitude (also at the equator), in km.
+# Dividing by them keeps the bounding box a superset of the geodesic circle.
+MIN_KM_PER_DEGREE_LAT = 110.574
+MAX_KM_PER_DEGREE_LNG = 111.321
+
+# Extra safety margin so rows sitting exactly on the circle are never cut off.
+BOX_MARGIN = 1.01
+
+# Nearest-neighbour search starts with this radius and widens it by
+# NEAREST_GROWTH until enough rows are found or the whole globe is covered.
+NEAREST_START_RADIUS_KM = 2.0
+NEAREST_GROWTH = 4
+HALF_EARTH_CIRCUMFERENCE_KM = 20_038.0
+
+
+def bounding_box(lat, lng, radius_km):
+    """
+    Return (min_lat, max_lat, min_lng, max_lng) enclosing every point within
+    radius_km of (lat, lng). Longitudes may fall outside [-180, 180] when the box
+    crosses the antimeridian; min_lng/max_lng are None when the box spans all longitudes.
+    """
+    delta_lat = radius_km / MIN_KM_PER_DEGREE_LAT * BOX_MARGIN
+    min_lat = max(lat - delta_lat, -90.0)
+    max_lat = min(lat + delta_lat, 90.0)
+
+    widest_lat = max(abs(min_lat), abs(max_lat))
+    if widest_lat >= 89.9:
+        return min_lat, max_lat, None, None
+
+    km_per_degree_lng = MAX_KM_PER_DEGREE_LNG * math.cos(math.radians(widest_lat))
+    delta_lng = radius_km / km_per_degree_lng * BOX_MARGIN
+    if delta_lng >= 180:
+        return min_lat, max_lat, None, None
+
+    return min_lat, max_lat, lng - delta_lng, lng + delta_lng
+
+
+def parse_bbox(value):
+    """
+    Parse a 'west,south,east,north' viewport string into (south, north, west, east).
+    A viewport crossing the antimeridian gets east > 180. Raises ValueError.
+    """
+    west, south, east, north = (float(part) for part in value.split(','))
+    if not (-90 <= south <= north <= 90) or not (-180 <= west <= 180 and -180 <= east <= 180):
+        raise ValueError("Invalid bounding box.")
+    if east < west:
+        east += 360
+    return south, north, west, east
+
+
+def geohash_q(cells, prefix=""):
+    """
+    Match locations whose geohash starts with one of `cells`. Each prefix is
+    expressed as a range so it stays an index seek on every backend.
+    """
+    q = Q()
+    for cell in cells:
+        q |= Q(**{
+            f"{prefix}geohash__gte": cell,
+            f"{prefix}geohash__lt": cell + geohash.PREFIX_END,
+        })
+    return q
+
+
+def box_q(min_lat, max_lat, min_lng, max_lng, prefix=""):
+    """
+    Build an index-friendly Q object matching coordinates inside the box.
+    `prefix` is the lookup path to the Location model, e.g. "location__".
+    """
+    cells = geohash.cover(min_lat, max_lat, min_lng, max_lng)
+    q = Q()
+    if cells:
+        # Rows written with bulk_create()/update() have no geohash yet; the
+        # coordinate bounds below still filter them correctly.
+        q = geohash_q(cells, prefix) | Q(**{f"{prefix}geohash": ""})
+    q &= Q(**{
+        f"{prefix}latitude__gte": min_lat,
+        f"{prefix}latitude__lte": max_lat,
+    })
+    if min_lng is None:
+        return q & Q(**{f"{prefix}longitude__isnull": False})
+
+    if min_lng < -180:
+        lng_q = (
+            Q(**{f"{prefix}longitude__gte": min_lng + 360})
+            | Q(**{f"{prefix}longitude__lte": max_lng})
+        )
+    elif max_lng > 180:
+        lng_q = (
+            Q(**{f"{prefix}longitude__gte": min_lng})
+            | Q(**{f"{prefix}longitude__lte": max_lng - 360})
+        )
+    else:
+        lng_q = Q(**{
+            f"{prefix}longitude__gte": min_lng,
+            f"{prefix}longitude__lte": max_lng,
+        })
+
+    return q & lng_q
+
+
+def bounding_box_q(lat, lng, radius_km, prefix=""):
+    """Build an index-friendly Q object matching coordinates around a radius search."""
+    return box_q(*bounding_box(lat, lng, radius_km), prefix=prefix)
+
+
+def nearest(queryset, lat, lng, limit, prefix=""):
+    """
+    Return up to `limit` (id, distance_km) pairs from `queryset`, nearest first.
+
+    Candidates are fetched box by box with a growing radius. Only rows within
+    the current radius are trusted, since rows closer than that are guaranteed
+    to be inside the box, so each round reads a small indexed slice of the table.
+    """
+    fields = ("id", f"{prefix}latitude", f"{prefix}longitude")
+    radius_km = NEAREST_START_RADIUS_KM
+
+    while radius_km < HALF_EARTH_CIRCUMFERENCE_KM:
+        rows = list(queryset.filter(bounding_box_q(lat, lng, radius_km, prefix)).values_list(*fields))
+        ranked = ids_by_distance(lat, lng, rows)
+        if sum(1 for _, km in ranked if km <= radius_km) >= limit:
+            return ranked[:limit]
+        radius_km *= NEAREST_GROWTH
+
+    rows = queryset.filter(**{
+        f"{prefix}latitude__isnull": False,
+        f"{prefix}longitude__isnull": False,
+    }).values_list(*fields)
+    return ids_by_distance(lat, lng, list(rows), limit)
@@ -0,0 +1,107 @@
+import math
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+MAX_PRECISION = 12
+
+# One character past the last base32 symbol: every geohash starting with
+# `prefix` sorts in the half-open range [prefix, prefix + PREFIX_END).
+PREFIX_END = "{"
+
+
+def encode(latitude, longitude, precision=MAX_PRECISION):
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(chars) < precision:
+        if even:
+            mid = (lng_range[0] + lng_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lng_range[0] = mid
+            else:
+                bits <<= 1
+                lng_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+        even = not even
+
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(chars)
+
+
+def cell_size(precision):
+    """Return (height, width) in degrees of a geohash cell at the given precision."""
+    total_bits = 5 * precision
+    lng_bits = math.ceil(total_bits / 2)
+    lat_bits = total_bits // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def _cells_for_range(min_lat, max_lat, min_lng, max_lng, precision):
+    height, width = cell_size(precision)
+    first_row = math.floor((min_lat + 90.0) / height)
+    last_row = min(math.floor((max_lat + 90.0) / height), 2 ** (5 * precision // 2) - 1)
+    first_col = math.floor((min_lng + 180.0) / width)
+    last_col = min(math.floor((max_lng + 180.0) / width), 2 ** math.ceil(5 * precision / 2) - 1)
+
+    cells = set()
+    for row in range(first_row, last_row + 1):
+        for col in range(first_col, last_col + 1):
+            center_lat = -90.0 + (row + 0.5) * height
+            center_lng = -180.0 + (col + 0.5) * width
+            cells.add(encode(center_lat, center_lng, precision))
+    return cells
+
+
+def _count_cells(lng_ranges, min_lat, max_lat, precision):
+    height, width = cell_size(precision)
+    rows = math.floor((max_lat + 90.0) / height) - math.floor((min_lat + 90.0) / height) + 1
+    cols = sum(
+        math.floor((hi + 180.0) / width) - math.floor((lo + 180.0) / width) + 1
+        for lo, hi in lng_ranges
+    )
+    return rows * cols
+
+
+def cover(min_lat, max_lat, min_lng=None, max_lng=None, max_cells=16):
+    """
+    Return the geohash prefixes of the finest precision whose cells cover the box
+    using at most `max_cells` cells. Longitudes outside [-180, 180] wrap around the
+    antimeridian; missing longitudes mean the box spans every longitude.
+    An empty list means the box is too large to be worth narrowing.
+    """
+    if min_lng is None or max_lng is None:
+        lng_ranges = [(-180.0, 180.0)]
+    elif min_lng < -180:
+        lng_ranges = [(min_lng + 360, 180.0), (-180.0, max_lng)]
+    elif max_lng > 180:
+        lng_ranges = [(min_lng, 180.0), (-180.0, max_lng - 360)]
+    else:
+        lng_ranges = [(min_lng, max_lng)]
+
+    min_lat = max(min_lat, -90.0)
+    max_lat = min(max_lat, 90.0)
+
+    for precision in range(MAX_PRECISION, 0, -1):
+        if _count_cells(lng_ranges, min_lat, max_lat, precision) <= max_cells:
+            cells = set()
+            for lo, hi in lng_ranges:
+                cells |= _cells_for_range(min_lat, max_lat, lo, hi, precision)
+            return sorted(cells)
+
+    return []
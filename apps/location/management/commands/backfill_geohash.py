@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from apps.location.models import Location
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill Location.geohash and the city/district lookup keys for rows saved "
+        "without them, e.g. after `loaddata german_locations` (fixtures bypass Location.save)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        pending = []
+        updated = 0
+
+        fields = ['geohash', *Location.KEY_FIELDS.values()]
+        locations = Location.objects.only('id', 'latitude', 'longitude', *Location.KEY_FIELDS, *fields).order_by('id')
+        for location in locations.iterator(chunk_size=batch_size):
+            values = {'geohash': location.compute_geohash(), **location.compute_keys()}
+            if any(getattr(location, field) != value for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(location, field, value)
+                pending.append(location)
+
+            if len(pending) >= batch_size:
+                Location.objects.bulk_update(pending, fields)
+                updated += len(pending)
+                pending = []
+
+        if pending:
+            Location.objects.bulk_update(pending, fields)
+            updated += len(pending)
+
+        self.stdout.write(self.style.SUCCESS(f"Updated derived columns for {updated} locations."))
@@ -0,0 +1,54 @@
+import random
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from geopy.distance import distance
+
+from apps.location.distance import haversine_km
+
+# Rough bounding box of Germany.
+LAT_RANGE = (47.3, 55.1)
+LNG_RANGE = (5.9, 15.0)
+
+
+class Command(BaseCommand):
+    help = "Compare the per-row geopy distance loop with the vectorized haversine engine."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=100_000)
+        parser.add_argument('--radius-km', type=float, default=50.0)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        count = options['count']
+        radius_km = options['radius_km']
+        rng = random.Random(options['seed'])
+
+        origin = (52.52, 13.405)
+        points = [(rng.uniform(*LAT_RANGE), rng.uniform(*LNG_RANGE)) for _ in range(count)]
+        latitudes = [lat for lat, _ in points]
+        longitudes = [lng for _, lng in points]
+
+        started = time.perf_counter()
+        geopy_km = [distance(origin, point).km for point in points]
+        geopy_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        vector_km = haversine_km(origin[0], origin[1], latitudes, longitudes)
+        vector_seconds = time.perf_counter() - started
+
+        geopy_km = np.asarray(geopy_km)
+        relative_error = np.abs(vector_km - geopy_km) / np.maximum(geopy_km, 1e-9)
+        geopy_hits = geopy_km <= radius_km
+        vector_hits = vector_km <= radius_km
+
+        self.stdout.write(f"Points:            {count}")
+        self.stdout.write(f"geopy loop:        {geopy_seconds:.3f}s")
+        self.stdout.write(f"numpy haversine:   {vector_seconds:.4f}s")
+        self.stdout.write(f"Speedup:           {geopy_seconds / vector_seconds:.0f}x")
+        self.stdout.write(f"Max relative diff: {relative_error.max():.4%}")
+        self.stdout.write(
+            f"Within {radius_km:g} km: geopy={int(geopy_hits.sum())} numpy={int(vector_hits.sum())} "
+            f"disagreeing={int((geopy_hits != vector_hits).sum())}"
+        )
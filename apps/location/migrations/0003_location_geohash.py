@@ -0,0 +1,35 @@
+# Generated by Django 5.2.1 on 2026-10-18 10:57
+
+from django.db import migrations, models
+
+from apps.location.geohash import encode
+
+
+def backfill_geohash(apps, schema_editor):
+    Location = apps.get_model('location', 'Location')
+    pending = []
+    locations = Location.objects.filter(latitude__isnull=False, longitude__isnull=False).only('id', 'latitude', 'longitude')
+    for location in locations.iterator(chunk_size=1000):
+        location.geohash = encode(location.latitude, location.longitude)
+        pending.append(location)
+        if len(pending) >= 1000:
+            Location.objects.bulk_update(pending, ['geohash'])
+            pending = []
+    if pending:
+        Location.objects.bulk_update(pending, ['geohash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('location', '0002_location_lat_lng_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='location',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Precomputed from latitude/longitude for indexed area lookups.', max_length=12),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+    ]
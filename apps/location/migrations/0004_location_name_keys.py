@@ -0,0 +1,44 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:13
+
+from django.db import migrations, models
+
+from apps.location.normalize import normalize_key
+
+
+def backfill_name_keys(apps, schema_editor):
+    Location = apps.get_model('location', 'Location')
+    pending = []
+    for location in Location.objects.only('id', 'city', 'district').iterator(chunk_size=1000):
+        location.city_key = normalize_key(location.city)
+        location.district_key = normalize_key(location.district)
+        pending.append(location)
+        if len(pending) >= 1000:
+            Location.objects.bulk_update(pending, ['city_key', 'district_key'])
+            pending = []
+    if pending:
+        Location.objects.bulk_update(pending, ['city_key', 'district_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('location', '0003_location_geohash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='location',
+            name='city_key',
+            field=models.CharField(blank=True, editable=False, help_text='Case- and accent-folded city used for indexed lookups.', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='location',
+            name='district_key',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Case- and accent-folded district used for indexed lookups.', max_length=100),
+        ),
+        migrations.RunPython(backfill_name_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='location',
+            index=models.Index(fields=['city_key', 'district_key'], name='location_city_district_key_idx'),
+        ),
+    ]
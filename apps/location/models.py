@@ -1,5 +1,8 @@
 from django.db import models
 
+from apps.location.geohash import MAX_PRECISION, encode
+from apps.location.normalize import normalize_key
+
 class Location(models.Model):
     city = models.CharField(max_length=100)
     district = models.CharField(max_length=100, blank=True)
@@ -9,5 +12,57 @@ class Location(models.Model):
     latitude = models.FloatField(null=True, blank=True)
     longitude = models.FloatField(null=True, blank=True)
 
+    geohash = models.CharField(
+        max_length=MAX_PRECISION,
+        blank=True,
+        editable=False,
+        db_index=True,
+        help_text="Precomputed from latitude/longitude for indexed area lookups."
+    )
+
+    city_key = models.CharField(
+        max_length=100,
+        blank=True,
+        editable=False,
+        help_text="Case- and accent-folded city used for indexed lookups."
+    )
+    district_key = models.CharField(
+        max_length=100,
+        blank=True,
+        editable=False,
+        db_index=True,
+        help_text="Case- and accent-folded district used for indexed lookups."
+    )
+
+    KEY_FIELDS = {'city': 'city_key', 'district': 'district_key'}
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['latitude', 'longitude'], name='location_lat_lng_idx'),
+            models.Index(fields=['city_key', 'district_key'], name='location_city_district_key_idx'),
+        ]
+
+    def compute_geohash(self):
+        if self.latitude is None or self.longitude is None:
+            return ""
+        return encode(self.latitude, self.longitude)
+
+    def compute_keys(self):
+        return {key: normalize_key(getattr(self, name)) for name, key in self.KEY_FIELDS.items()}
+
+    def save(self, *args, **kwargs):
+        self.geohash = self.compute_geohash()
+        for key, value in self.compute_keys().items():
+            setattr(self, key, value)
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if {'latitude', 'longitude'} & update_fields:
+                update_fields.add('geohash')
+            update_fields |= {key for name, key in self.KEY_FIELDS.items() if name in update_fields}
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.city}, {self.district}" if self.district else self.city
@@ -0,0 +1,23 @@
+import unicodedata
+
+
+def normalize_key(value):
+    """
+    Fold a place name into its lookup key: accents stripped, case folded and
+    whitespace collapsed, so 'Düsseldorf', 'dusseldorf ' and 'DÜSSELDORF' all
+    become 'dusseldorf'. Keys are compared with plain equality or prefix ranges,
+    which stay index seeks whatever the column collation is.
+    """
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize('NFKD', value)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())
+
+
+def prefix_bounds(key):
+    """
+    Return (low, high) such that every key starting with `key` falls in
+    [low, high). Range comparisons stay index seeks even where LIKE does not.
+    """
+    return key, key[:-1] + chr(ord(key[-1]) + 1)
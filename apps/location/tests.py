@@ -0,0 +1,66 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.location.models import Location
+from apps.location.normalize import normalize_key, prefix_bounds
+from apps.rent.models import Rent
+from apps.users.models import User
+
+
+class NormalizeKeyTests(SimpleTestCase):
+
+    def test_case_accents_and_spaces_are_folded(self):
+        for spelling in ("Düsseldorf", "DÜSSELDORF", "dusseldorf", "  Dusseldorf "):
+            self.assertEqual(normalize_key(spelling), "dusseldorf")
+        self.assertEqual(normalize_key("Frankfurt  am   Main"), "frankfurt am main")
+        self.assertEqual(normalize_key(None), "")
+
+    def test_prefix_bounds(self):
+        low, high = prefix_bounds("ber")
+        self.assertEqual((low, high), ("ber", "bes"))
+        self.assertTrue(all(low <= key < high for key in ("ber", "berlin", "bernau", "berzz")))
+        self.assertFalse(any(low <= key < high for key in ("beq", "bequem", "bes", "besigheim")))
+
+
+class LocationKeyLookupTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.host = User.objects.create_user(
+            email="host@example.com", full_name="Host", password="pass12345", is_host=True
+        )
+        places = [
+            ("Düsseldorf", "Altstadt"), ("Berlin", "Mitte"), ("Berlin", "Kreuzberg"),
+            ("Bernau", ""), ("Bequem", ""), ("Besigheim", ""),
+        ]
+        for city, district in places:
+            location = Location.objects.create(city=city, district=district, latitude=50.0, longitude=10.0)
+            Rent.objects.create(
+                owner=self.host, location=location, title=f"{city} {district}".strip(), description="Flat",
+                rooms=1, property_type="STUDIO", is_daily_available=True, daily_price=Decimal("50.00"),
+            )
+
+    def titles(self, **params):
+        response = self.client.get(reverse("rent-list-active"), params)
+        self.assertEqual(response.status_code, 200)
+        return {item["title"] for item in response.data["results"]}
+
+    def test_city_filter_ignores_case_and_accents(self):
+        for spelling in ("DÜSSELDORF", "dusseldorf", "Düsseldorf"):
+            self.assertEqual(self.titles(city=spelling), {"Düsseldorf Altstadt"})
+
+    def test_district_filter(self):
+        self.assertEqual(self.titles(city="berlin", district="KREUZBERG"), {"Berlin Kreuzberg"})
+        self.assertEqual(self.titles(district="altstadt"), {"Düsseldorf Altstadt"})
+
+    def test_with_rents_matches_city_prefixes(self):
+        response = self.client.get(reverse("locations-with-rents"), {"city": "Ber"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(item["city"] for item in response.data), ["Berlin", "Berlin", "Bernau"])
+
+        response = self.client.get(reverse("locations-with-rents"), {"city": "BERLIN", "district": "kreuz"})
+        self.assertEqual([rent["title"] for item in response.data for rent in item["rents"]], ["Berlin Kreuzberg"])
@@ -1,3 +1,4 @@
+from django.db.models import Prefetch
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import generics, permissions
@@ -9,7 +10,10 @@ from django.contrib.auth.password_validation import validate_password
 from rest_framework.views import APIView
 
 from apps.location.models import Location
+from apps.location.normalize import normalize_key, prefix_bounds
 from apps.location.serializers import LocationWithRentsSerializer, LocationSerializer
+from apps.rent.models import Rent
+from apps.rent.serializers import renter_ids_by_rent
 
 User = get_user_model()
 
@@ -50,34 +54,33 @@ class LocationsWithRentsAPIView(APIView):
     @swagger_auto_schema(
         operation_summary="📍 List locations with filtered rental listings",
         manual_parameters=[
-            openapi.Parameter('city', openapi.IN_QUERY, description="City name", type=openapi.TYPE_STRING),
-            openapi.Parameter('district', openapi.IN_QUERY, description="District", type=openapi.TYPE_STRING),
+            openapi.Parameter('city', openapi.IN_QUERY, description="City name or its beginning", type=openapi.TYPE_STRING),
+            openapi.Parameter('district', openapi.IN_QUERY, description="District name or its beginning", type=openapi.TYPE_STRING),
             openapi.Parameter('country', openapi.IN_QUERY, description="Country", type=openapi.TYPE_STRING),
             openapi.Parameter('is_active', openapi.IN_QUERY, description="Only active listings", type=openapi.TYPE_BOOLEAN),
         ]
     )
     def get(self, request):
-        city = request.query_params.get('city')
-        district = request.query_params.get('district')
         country = request.query_params.get('country')
         is_active = request.query_params.get('is_active')
 
         locations = Location.objects.all()
 
-        if city:
-            locations = locations.filter(city__icontains=city)
-        if district:
-            locations = locations.filter(district__icontains=district)
+        for name in ('city', 'district'):
+            key = normalize_key(request.query_params.get(name))
+            if key:
+                low, high = prefix_bounds(key)
+                locations = locations.filter(**{f'{name}_key__gte': low, f'{name}_key__lt': high})
         if country:
             locations = locations.filter(country__icontains=country)
 
-        locations = locations.prefetch_related('rents')
+        rents = Rent.objects.select_related('owner', 'location')
+        if is_active in ['true', 'True', '1']:
+            rents = rents.filter(is_active=True)
+        locations = list(locations.prefetch_related(Prefetch('rents', queryset=rents, to_attr='rents_cache')))
 
-        for loc in locations:
-            rents_qs = loc.rents.all()
-            if is_active in ['true', 'True', '1']:
-                rents_qs = rents_qs.filter(is_active=True)
-            loc.rents_cache = rents_qs
-
-        serializer = LocationWithRentsSerializer(locations, many=True, context={'request': request})
+        renter_ids = renter_ids_by_rent([rent.pk for loc in locations for rent in loc.rents_cache])
+        serializer = LocationWithRentsSerializer(
+            locations, many=True, context={'request': request, 'renter_ids': renter_ids}
+        )
         return Response(serializer.data)
@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from apps.notifications.models import OutboxMessage
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'recipient', 'status', 'attempts', 'available_at', 'sent_at')
+    list_filter = ('status', 'kind')
+    search_fields = ('recipient', 'subject')
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.notifications.outbox import deliver, deliver_digests
+
+
+class Command(BaseCommand):
+    help = "Deliver queued notifications from the outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--interval', type=int, default=0,
+                            help="Keep running and poll the outbox every N seconds instead of draining it once.")
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = self.drain(deliver, options['batch_size'])
+            digests, digests_failed = self.drain(deliver_digests, options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Sent {sent} notifications and {digests} digests, {failed + digests_failed} failed."
+            ))
+
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    @staticmethod
+    def drain(step, batch_size):
+        sent = failed = 0
+        while True:
+            batch_sent, batch_failed = step(batch_size=batch_size)
+            sent, failed = sent + batch_sent, failed + batch_failed
+            if batch_sent + batch_failed < batch_size:
+                return sent, failed
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxmessage',
+            name='digest',
+            field=models.BooleanField(default=False, help_text="Delivered as part of the recipient's next digest."),
+        ),
+        migrations.AddField(
+            model_name='outboxmessage',
+            name='payload',
+            field=models.JSONField(blank=True, default=dict, help_text='Event data a digest line is rendered from.'),
+        ),
+        migrations.AlterField(
+            model_name='outboxmessage',
+            name='body',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='outboxmessage',
+            name='subject',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='outboxmessage',
+            index=models.Index(fields=['recipient', 'status'], name='outbox_recipient_idx'),
+        ),
+    ]
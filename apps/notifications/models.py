@@ -0,0 +1,41 @@
+from django.db import models
+from django.utils import timezone
+
+
+class OutboxMessage(models.Model):
+    """
+    A notification waiting to be delivered. Rows are written in the same
+    transaction as the change they describe and sent later by
+    `manage.py send_notifications`, so a rolled back request sends nothing and
+    a crash never loses a committed message.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=50)
+    recipient = models.EmailField()
+    subject = models.CharField(max_length=255, blank=True)
+    body = models.TextField(blank=True)
+    digest = models.BooleanField(default=False, help_text="Delivered as part of the recipient's next digest.")
+    payload = models.JSONField(default=dict, blank=True, help_text="Event data a digest line is rendered from.")
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now, help_text="Not sent before this time (retry backoff).")
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='outbox_due_idx'),
+            models.Index(fields=['recipient', 'status'], name='outbox_recipient_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} to {self.recipient} ({self.status})"
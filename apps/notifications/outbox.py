@@ -0,0 +1,168 @@
+import logging
+from datetime import timedelta
+from itertools import groupby
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from apps.notifications.models import OutboxMessage
+
+logger = logging.getLogger('rental')
+
+# One line per event in a host digest, filled from the event payload.
+DIGEST_LINES = {
+    'booking_requested': "New booking request for '{title}' ({start} – {end}) from {renter} ({renter_email})",
+    'rent_created': "Your listing '{title}' in {city} is live",
+}
+
+
+def add(kind, recipient, subject, body):
+    """Queue a message. Call it inside the transaction that makes the change."""
+    return OutboxMessage.objects.create(kind=kind, recipient=recipient, subject=subject, body=body)
+
+
+def digest_window():
+    return timedelta(seconds=getattr(settings, "NOTIFICATION_DIGEST_WINDOW", 0))
+
+
+def add_host_event(kind, recipient, subject, body, **payload):
+    """
+    Queue a host notification. With NOTIFICATION_DIGEST_WINDOW set only the
+    payload is stored, and the event becomes one line of the host's next digest.
+    """
+    window = digest_window()
+    if not window:
+        return add(kind, recipient, subject, body)
+    return OutboxMessage.objects.create(
+        kind=kind, recipient=recipient, digest=True, payload=payload, available_at=timezone.now() + window,
+    )
+
+
+def retry_delay(attempts):
+    base = getattr(settings, "NOTIFICATION_RETRY_DELAY", 60)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), 6 * 3600))
+
+
+def _send(connection, messages, recipient, subject, body, now):
+    """Send one email on behalf of `messages` and record the outcome on them. Returns True on success."""
+    max_attempts = getattr(settings, "NOTIFICATION_MAX_ATTEMPTS", 5)
+    error = None
+    try:
+        EmailMessage(subject, body, None, [recipient], connection=connection).send()
+    except Exception as exc:
+        logger.warning("Notification to %s failed: %s", recipient, exc)
+        error = str(exc)
+
+    for message in messages:
+        message.attempts += 1
+        if error is None:
+            message.status = 'sent'
+            message.sent_at = timezone.now()
+        else:
+            message.last_error = error
+            if message.attempts >= max_attempts:
+                message.status = 'failed'
+            else:
+                message.available_at = now + retry_delay(message.attempts)
+    return error is None
+
+
+def _save(messages):
+    OutboxMessage.objects.bulk_update(messages, ['status', 'attempts', 'available_at', 'last_error', 'sent_at'])
+
+
+def _claim(messages, now):
+    """
+    Mark `messages` as in flight by pushing their available_at past the claim
+    timeout. Call it in the transaction that locked them; other workers then
+    skip the rows once it commits, and pick them up again only if this worker
+    dies before recording the outcome.
+    """
+    lease = now + timedelta(seconds=getattr(settings, "NOTIFICATION_CLAIM_TIMEOUT", 300))
+    OutboxMessage.objects.filter(pk__in=[message.pk for message in messages]).update(available_at=lease)
+    for message in messages:
+        message.available_at = lease
+
+
+def deliver(batch_size=100, now=None):
+    """
+    Send one batch of due messages. Rows are claimed in a short transaction
+    with SELECT ... FOR UPDATE SKIP LOCKED, so several workers can drain the
+    outbox side by side. The emails go out after that commits, and the
+    outcomes are written back in one more statement, so no row lock is held
+    while talking to the mail server. Failed sends are retried with
+    exponential backoff until NOTIFICATION_MAX_ATTEMPTS, then left as 'failed'.
+    Delivery is at least once: a crash between sending and recording resends
+    the batch once the claim times out. Returns (sent, failed) counts.
+    """
+    now = now or timezone.now()
+    sent = failed = 0
+
+    with transaction.atomic():
+        messages = list(
+            OutboxMessage.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', digest=False, available_at__lte=now)
+            .order_by('available_at', 'id')[:batch_size]
+        )
+        if not messages:
+            return 0, 0
+        _claim(messages, now)
+
+    connection = get_connection()
+    for message in messages:
+        if _send(connection, [message], message.recipient, message.subject, message.body, now):
+            sent += 1
+        else:
+            failed += 1
+    _save(messages)
+    return sent, failed
+
+
+def render_digest(events):
+    lines = [f"- {DIGEST_LINES[event.kind].format_map(event.payload)}" for event in events]
+    subject = f"{len(lines)} update{'s' if len(lines) != 1 else ''} for your StayFlow listings"
+    body = "Here is what happened since your last summary:\n\n" + "\n".join(lines)
+    return subject, body
+
+
+def deliver_digests(batch_size=100, now=None):
+    """
+    Send one digest to each of up to `batch_size` hosts whose oldest queued
+    event has waited out the digest window. All of a host's pending events,
+    due or not, are rendered into that single message in one pass. Events are
+    claimed and sent the same way as in deliver(), outside the transaction.
+    Returns (digests sent, digests failed).
+    """
+    now = now or timezone.now()
+    sent = failed = 0
+
+    with transaction.atomic():
+        due = OutboxMessage.objects.filter(status='pending', digest=True, available_at__lte=now)
+        recipients = set()
+        for recipient in due.order_by('available_at').values_list('recipient', flat=True).iterator():
+            recipients.add(recipient)
+            if len(recipients) >= batch_size:
+                break
+        if not recipients:
+            return 0, 0
+
+        events = list(
+            OutboxMessage.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', digest=True, recipient__in=recipients)
+            .order_by('recipient', 'id')
+        )
+        if not events:
+            return 0, 0
+        _claim(events, now)
+
+    connection = get_connection()
+    for recipient, group in groupby(events, key=lambda event: event.recipient):
+        group = list(group)
+        if _send(connection, group, recipient, *render_digest(group), now):
+            sent += 1
+        else:
+            failed += 1
+    _save(events)
+    return sent, failed
@@ -0,0 +1,91 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.notifications import outbox
+from apps.notifications.models import OutboxMessage
+
+
+class OutboxDeliveryTests(TestCase):
+
+    def test_worker_drains_outbox_in_batches(self):
+        for index in range(5):
+            outbox.add("test", f"user{index}@example.com", f"Subject {index}", "Body")
+
+        call_command("send_notifications", batch_size=2, stdout=mock.MagicMock())
+
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(mail.outbox[0].to, ["user0@example.com"])
+        self.assertFalse(OutboxMessage.objects.exclude(status="sent").exists())
+
+    def test_messages_are_claimed_before_sending(self):
+        message = outbox.add("test", "user@example.com", "Subject", "Body")
+        now = timezone.now()
+
+        def send(*args, **kwargs):
+            # A second worker polling while the mail server is busy finds nothing due.
+            self.assertEqual(outbox.deliver(now=now), (0, 0))
+            return 1
+
+        with mock.patch("django.core.mail.EmailMessage.send", side_effect=send):
+            self.assertEqual(outbox.deliver(now=now), (1, 0))
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), ("sent", 1))
+
+    @override_settings(NOTIFICATION_MAX_ATTEMPTS=2, NOTIFICATION_RETRY_DELAY=60)
+    def test_failed_sends_back_off_and_give_up(self):
+        message = outbox.add("test", "user@example.com", "Subject", "Body")
+        now = timezone.now()
+
+        with mock.patch("django.core.mail.EmailMessage.send", side_effect=OSError("connection refused")):
+            self.assertEqual(outbox.deliver(now=now), (0, 1))
+            message.refresh_from_db()
+            self.assertEqual((message.status, message.attempts), ("pending", 1))
+            self.assertEqual(message.available_at, now + timedelta(seconds=60))
+
+            self.assertEqual(outbox.deliver(now=now), (0, 0))
+            self.assertEqual(outbox.deliver(now=now + timedelta(minutes=2)), (0, 1))
+
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.last_error), ("failed", "connection refused"))
+
+
+@override_settings(NOTIFICATION_DIGEST_WINDOW=600)
+class HostDigestTests(TestCase):
+
+    def event(self, recipient, title):
+        return outbox.add_host_event(
+            "rent_created", recipient, "Subject", "Body", title=title, city="Berlin",
+        )
+
+    def test_host_events_are_sent_as_one_digest_per_host(self):
+        for index in range(3):
+            self.event("busy@example.com", f"Flat {index}")
+        self.event("quiet@example.com", "Loft")
+        later = timezone.now() + timedelta(minutes=11)
+
+        self.assertEqual(outbox.deliver_digests(now=timezone.now()), (0, 0))
+        self.assertEqual(outbox.deliver(now=later), (0, 0))
+        self.assertEqual(outbox.deliver_digests(now=later), (2, 0))
+
+        by_recipient = {message.to[0]: message for message in mail.outbox}
+        self.assertEqual(set(by_recipient), {"busy@example.com", "quiet@example.com"})
+        self.assertEqual(by_recipient["busy@example.com"].subject, "3 updates for your StayFlow listings")
+        self.assertIn("Your listing 'Flat 2' in Berlin is live", by_recipient["busy@example.com"].body)
+        self.assertFalse(OutboxMessage.objects.exclude(status="sent").exists())
+
+    def test_digest_events_are_claimed_before_sending(self):
+        self.event("busy@example.com", "Flat")
+        later = timezone.now() + timedelta(minutes=11)
+
+        def send(*args, **kwargs):
+            self.assertEqual(outbox.deliver_digests(now=later), (0, 0))
+            return 1
+
+        with mock.patch("django.core.mail.EmailMessage.send", side_effect=send):
+            self.assertEqual(outbox.deliver_digests(now=later), (1, 0))
+        self.assertFalse(OutboxMessage.objects.exclude(status="sent").exists())
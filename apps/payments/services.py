@@ -1,5 +1,3 @@
-from decimal import Decimal
-
 from django.db import transaction
 from django.utils import timezone
 
@@ -8,17 +6,11 @@ from apps.payments.models import Payment
 
 @transaction.atomic
 def process_payment_for_booking(booking):
-    city = booking.rent.location.city.lower()
-    commission_map = {
-        "berlin": Decimal("0.15"),
-        "hamburg": Decimal("0.20"),
-        "munich": Decimal("0.25"),
-    }
-    rate = commission_map.get(city, Decimal("0.20"))
-
+    # The renter pays what the booking was quoted at, even if the policy changed since.
+    rate = booking.commission_percent
     base = booking.base_price
-    commission = base * rate
-    total = base + commission
+    commission = booking.commission_amount
+    total = booking.total_price
 
     Payment.objects.create(
         booking=booking,
@@ -35,10 +27,7 @@ def process_payment_for_booking(booking):
 
 
     booking.status = "confirmed"
-    booking.total_price = total
-    booking.commission_amount = commission
-    booking.commission_percent = rate
-    booking.save()
+    booking.save(update_fields=['status', 'updated_at'])
 
     BookingLog.objects.create(
         booking=booking,
@@ -1,5 +1,8 @@
 from django.contrib import admin
+from .cache import invalidate_on_commit
+from .clusters import mark_dirty
 from .models import Rent
+from .popularity import refresh_popularity
 
 @admin.register(Rent)
 class RentAdmin(admin.ModelAdmin):
@@ -17,7 +20,11 @@ class RentAdmin(admin.ModelAdmin):
         return Rent.all_objects.select_related("owner", "location")
 
     def soft_delete_selected(self, request, queryset):
+        geohashes = set(queryset.values_list('location__geohash', flat=True))
         queryset.update(is_deleted=True)
+        mark_dirty(geohashes)
+        refresh_popularity(queryset)
+        invalidate_on_commit()
 
     soft_delete_selected.short_description = "Soft delete selected rentals"
 
@@ -0,0 +1,85 @@
+import hashlib
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+# Every cached public listing response is stored under the current version.
+# Any write to a Rent, Location or Rating bumps the version, so stale entries
+# are simply never read again and expire on their own.
+VERSION_KEY = "rent:responses:version"
+KEY_PREFIX = "rent:responses"
+
+
+def _cache():
+    return caches[getattr(settings, "RESPONSE_CACHE_ALIAS", "default")]
+
+
+def _timeout():
+    return getattr(settings, "RESPONSE_CACHE_TIMEOUT", 300)
+
+
+def current_version():
+    cache = _cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, timeout=None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+def bump_version():
+    cache = _cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, 1, timeout=None)
+
+
+def invalidate_on_commit():
+    transaction.on_commit(bump_version)
+
+
+def response_cache_key(request, scope, view_kwargs):
+    params = sorted(
+        (name, value)
+        for name in request.query_params
+        for value in sorted(request.query_params.getlist(name))
+        if value != ""
+    )
+    raw = "|".join([
+        scope,
+        request.get_host(),
+        urlencode(sorted(view_kwargs.items())),
+        urlencode(params),
+    ])
+    digest = hashlib.md5(raw.encode("utf-8")).hexdigest()
+    return f"{KEY_PREFIX}:{current_version()}:{scope}:{digest}"
+
+
+def cache_public_response(scope):
+    """
+    Cache successful GET responses for anonymous users. The key is built from
+    the normalized query parameters and URL kwargs of the request.
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            if request.method != "GET" or request.user.is_authenticated:
+                return view_method(self, request, *args, **kwargs)
+
+            key = response_cache_key(request, scope, kwargs)
+            data = _cache().get(key)
+            if data is not None:
+                return Response(data)
+
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                _cache().set(key, response.data, _timeout())
+            return response
+        return wrapper
+    return decorator
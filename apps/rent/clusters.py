@@ -0,0 +1,177 @@
+from django.db import transaction
+from django.db.models import Count, Min, Sum
+from django.db.models.functions import Substr
+
+from apps.location import geohash as gh
+from apps.location.geo import geohash_q
+from apps.rent.models import Rent, RentClusterCell, RentClusterDirtyCell
+
+# Cells are stored for geohash precisions 1..MAX_CLUSTER_PRECISION. The finest
+# level is aggregated from rents, every coarser level from its child cells, so a
+# single listing change touches at most 32 rows per level. Listing writes only
+# mark their finest cell dirty; `manage.py refresh_rent_clusters` recomputes
+# the dirty cells in batches.
+MAX_CLUSTER_PRECISION = 7
+
+# A viewport returns cells at most this many levels finer than the cells that
+# cover it (see geohash.cover), i.e. at most 16 * 32**2 cells, whatever the zoom.
+MAX_DETAIL_LEVELS = 2
+
+# (max zoom, precision): the first entry whose zoom bound is >= the requested zoom wins.
+ZOOM_PRECISION = [
+    (2, 1),
+    (4, 2),
+    (7, 3),
+    (10, 4),
+    (13, 5),
+    (16, 6),
+]
+
+CELL_FIELDS = ['count', 'latitude_sum', 'longitude_sum', 'priced_count', 'daily_price_sum', 'min_daily_price']
+
+
+def precision_for_zoom(zoom):
+    for max_zoom, precision in ZOOM_PRECISION:
+        if zoom <= max_zoom:
+            return precision
+    return MAX_CLUSTER_PRECISION
+
+
+def _listed_rents():
+    return Rent.objects.filter(is_active=True, location__geohash__gt="")
+
+
+def _aggregate_rents(prefixes):
+    queryset = _listed_rents()
+    if prefixes is not None:
+        queryset = queryset.filter(geohash_q(prefixes, prefix="location__"))
+
+    return queryset.annotate(
+        cell=Substr("location__geohash", 1, MAX_CLUSTER_PRECISION)
+    ).values("cell").annotate(
+        count=Count("id"),
+        latitude_sum=Sum("location__latitude"),
+        longitude_sum=Sum("location__longitude"),
+        priced_count=Count("daily_price"),
+        daily_price_sum=Sum("daily_price"),
+        min_daily_price=Min("daily_price"),
+    ).order_by()
+
+
+def _aggregate_children(precision, prefixes):
+    queryset = RentClusterCell.objects.filter(precision=precision + 1)
+    if prefixes is not None:
+        queryset = queryset.filter(geohash_q(prefixes))
+
+    return queryset.annotate(
+        cell=Substr("geohash", 1, precision)
+    ).values("cell").annotate(
+        count=Sum("count"),
+        latitude_sum=Sum("latitude_sum"),
+        longitude_sum=Sum("longitude_sum"),
+        priced_count=Sum("priced_count"),
+        daily_price_sum=Sum("daily_price_sum"),
+        min_daily_price=Min("min_daily_price"),
+    ).order_by()
+
+
+def _store(precision, rows, prefixes):
+    cells = [
+        RentClusterCell(
+            precision=precision,
+            geohash=row["cell"],
+            **{field: row[field] for field in CELL_FIELDS},
+        )
+        for row in rows
+        if row["count"]
+    ]
+
+    stale = RentClusterCell.objects.filter(precision=precision)
+    if prefixes is not None:
+        stale = stale.filter(geohash__in=prefixes).exclude(geohash__in=[cell.geohash for cell in cells])
+    stale.delete()
+
+    if cells:
+        RentClusterCell.objects.bulk_create(
+            cells,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['precision', 'geohash'],
+            update_fields=CELL_FIELDS + ['updated_at'],
+        )
+
+
+@transaction.atomic
+def refresh_cells(geohashes):
+    """Recompute the cells containing the given location geohashes at every precision."""
+    geohashes = {value for value in geohashes if value}
+    if not geohashes:
+        return
+
+    finest = {value[:MAX_CLUSTER_PRECISION] for value in geohashes}
+    _store(MAX_CLUSTER_PRECISION, _aggregate_rents(finest), finest)
+
+    for precision in range(MAX_CLUSTER_PRECISION - 1, 0, -1):
+        prefixes = {value[:precision] for value in geohashes}
+        _store(precision, _aggregate_children(precision, prefixes), prefixes)
+
+
+def mark_dirty(geohashes):
+    """Queue the cells of the given location geohashes for the next refresh."""
+    cells = {value[:MAX_CLUSTER_PRECISION] for value in geohashes if value}
+    RentClusterDirtyCell.objects.bulk_create(
+        [RentClusterDirtyCell(geohash=cell) for cell in cells], ignore_conflicts=True,
+    )
+
+
+def refresh_dirty(batch_size=500):
+    """Recompute every dirty cell, `batch_size` cells per transaction. Returns the number refreshed."""
+    refreshed = 0
+    while True:
+        with transaction.atomic():
+            dirty = list(
+                RentClusterDirtyCell.objects.select_for_update(skip_locked=True)
+                .order_by('id').values_list('id', 'geohash')[:batch_size]
+            )
+            if not dirty:
+                break
+            refresh_cells({cell for _, cell in dirty})
+            RentClusterDirtyCell.objects.filter(pk__in=[pk for pk, _ in dirty]).delete()
+        refreshed += len(dirty)
+        if len(dirty) < batch_size:
+            break
+    return refreshed
+
+
+@transaction.atomic
+def rebuild_all():
+    _store(MAX_CLUSTER_PRECISION, _aggregate_rents(None), None)
+    for precision in range(MAX_CLUSTER_PRECISION - 1, 0, -1):
+        _store(precision, _aggregate_children(precision, None), None)
+
+
+def clusters_in_box(south, north, west, east, zoom):
+    covering = gh.cover(south, north, west, east)
+    # Large viewports are served at a coarser precision than the zoom asks for,
+    # so the number of cells returned stays bounded.
+    coarsest = len(covering[0]) if covering else 0
+    precision = max(1, min(precision_for_zoom(zoom), coarsest + MAX_DETAIL_LEVELS))
+    prefixes = {cell[:precision] for cell in covering}
+
+    cells = RentClusterCell.objects.filter(precision=precision)
+    if prefixes:
+        cells = cells.filter(geohash_q(prefixes))
+
+    return [
+        {
+            "geohash": cell.geohash,
+            "count": cell.count,
+            "latitude": round(cell.latitude_sum / cell.count, 6),
+            "longitude": round(cell.longitude_sum / cell.count, 6),
+            "min_daily_price": str(cell.min_daily_price) if cell.min_daily_price is not None else None,
+            "avg_daily_price": (
+                str(round(cell.daily_price_sum / cell.priced_count, 2)) if cell.priced_count else None
+            ),
+        }
+        for cell in cells.order_by("geohash")
+    ]
@@ -0,0 +1,76 @@
+from django.db.models import Count, Min, Q
+
+from apps.rent.choices.room_type import RoomType
+
+# (label, lower bound inclusive, upper bound exclusive) for daily_price in EUR.
+DAILY_PRICE_BUCKETS = [
+    ("0-50", None, 50),
+    ("50-100", 50, 100),
+    ("100-200", 100, 200),
+    ("200+", 200, None),
+]
+
+
+def _price_bucket_q(lower, upper):
+    q = Q(daily_price__isnull=False)
+    if lower is not None:
+        q &= Q(daily_price__gte=lower)
+    if upper is not None:
+        q &= Q(daily_price__lt=upper)
+    return q
+
+
+def _grouped_counts(queryset, field):
+    return (
+        queryset.order_by()
+        .values(field)
+        .annotate(count=Count("id"))
+        .order_by("-count", field)
+    )
+
+
+def _city_counts(queryset):
+    # Group on the folded key the `city` filter matches on, so "Berlin" and
+    # "berlin " share one bucket; any of the spellings serves as its label.
+    return (
+        queryset.order_by()
+        .values("location__city_key")
+        .annotate(count=Count("id"), city=Min("location__city"))
+        .order_by("-count", "location__city_key")
+    )
+
+
+def build_facets(queryset):
+    """
+    Count listings in `queryset` per city, property type, rooms and daily price
+    bucket. Each dimension is a single grouped query, whatever its number of values.
+    """
+    property_labels = {rt.name: rt.value for rt in RoomType}
+
+    price_counts = queryset.order_by().aggregate(**{
+        label: Count("id", filter=_price_bucket_q(lower, upper))
+        for label, lower, upper in DAILY_PRICE_BUCKETS
+    })
+
+    return {
+        "city": [
+            {"value": row["city"], "key": row["location__city_key"], "count": row["count"]}
+            for row in _city_counts(queryset)
+        ],
+        "property_type": [
+            {
+                "value": row["property_type"],
+                "label": property_labels.get(row["property_type"], row["property_type"]),
+                "count": row["count"],
+            }
+            for row in _grouped_counts(queryset, "property_type")
+        ],
+        "rooms": [
+            {"value": row["rooms"], "count": row["count"]}
+            for row in _grouped_counts(queryset, "rooms")
+        ],
+        "daily_price": [
+            {"value": label, "min": lower, "max": upper, "count": price_counts[label]}
+            for label, lower, upper in DAILY_PRICE_BUCKETS
+        ],
+    }
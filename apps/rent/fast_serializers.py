@@ -0,0 +1,118 @@
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.response import Response
+
+from apps.location.serializers import LocationSerializer
+from apps.rent.models import Rent
+from apps.rent.serializers import renter_ids_by_rent
+from apps.users.serializers import UserProfileSerializer
+
+# Read-only fast path for listing pages: rows come straight from `.values()` and
+# are turned into the exact dicts RentSerializer produces, without building model
+# instances or running DRF field-by-field serialization. Keep the key order and
+# value formats in sync with RentSerializer.
+
+OWNER_FIELDS = UserProfileSerializer.Meta.fields
+LOCATION_FIELDS = LocationSerializer.Meta.fields
+
+# Model fields RentSerializer emits after its declared fields, in model order.
+DECLARED_FIELDS = ('owner', 'location', 'ratings_count')
+MODEL_FIELDS = [
+    field.name for field in Rent._meta.concrete_fields
+    if field.name not in DECLARED_FIELDS and not field.primary_key
+]
+DECIMAL_FIELDS = {
+    field.name: field.decimal_places for field in Rent._meta.concrete_fields
+    if field.get_internal_type() == 'DecimalField'
+}
+DATETIME_FIELDS = {
+    field.name for field in Rent._meta.concrete_fields
+    if field.get_internal_type() == 'DateTimeField'
+}
+
+
+def rent_rows(queryset):
+    """Turn a Rent queryset into a `.values()` queryset with everything the fast path needs."""
+    names = ['id', 'ratings_count', *MODEL_FIELDS]
+    names += [f'owner__{name}' for name in OWNER_FIELDS]
+    names += [f'location__{name}' for name in LOCATION_FIELDS]
+    if 'avg_rating' in queryset.query.annotations:
+        names.append('avg_rating')
+    return queryset.values(*names)
+
+
+def _decimal_formatter(places):
+    spec = f'.{places}f'
+    return lambda value: format(value, spec)
+
+
+def _datetime_formatter(tz):
+    # Same output as serializers.DateTimeField.to_representation.
+    def format_datetime(value):
+        if tz is not None and timezone.is_aware(value):
+            value = value.astimezone(tz)
+        value = value.isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return format_datetime
+
+
+def _formatters():
+    tz = timezone.get_current_timezone() if settings.USE_TZ else None
+    formatters = []
+    for name in MODEL_FIELDS:
+        if name in DECIMAL_FIELDS:
+            formatters.append((name, _decimal_formatter(DECIMAL_FIELDS[name])))
+        elif name in DATETIME_FIELDS:
+            formatters.append((name, _datetime_formatter(tz)))
+        else:
+            formatters.append((name, None))
+    return formatters
+
+
+def serialize_rent_rows(rows, context=None):
+    """Build RentSerializer-shaped dicts from rows produced by `rent_rows`."""
+    rows = list(rows)
+    context = context if context is not None else {}
+
+    renter_ids = context.setdefault('renter_ids', {})
+    missing = [row['id'] for row in rows if row['id'] not in renter_ids]
+    if missing:
+        renter_ids.update(renter_ids_by_rent(missing))
+
+    formatters = _formatters()
+    owner_keys = [(name, f'owner__{name}') for name in OWNER_FIELDS]
+    location_keys = [(name, f'location__{name}') for name in LOCATION_FIELDS]
+
+    data = []
+    for row in rows:
+        item = {
+            'id': row['id'],
+            'owner': {name: row[key] for name, key in owner_keys},
+            'location': {name: row[key] for name, key in location_keys},
+            'avg_rating': row['avg_rating'] if 'avg_rating' in row else row['average_rating'],
+            'ratings_count': row['ratings_count'],
+            'renter_ids': renter_ids[row['id']],
+        }
+        for name, formatter in formatters:
+            value = row[name]
+            item[name] = formatter(value) if formatter is not None and value is not None else value
+        data.append(item)
+    return data
+
+
+class FastRentListMixin:
+    """
+    `list()` for Rent list views that serializes pages through the fast path.
+    The view's queryset must be a Rent queryset; pagination works on the value rows.
+    """
+
+    def list(self, request, *args, **kwargs):
+        rows = rent_rows(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serialize_rent_rows(page))
+
+        return Response(serialize_rent_rows(rows))
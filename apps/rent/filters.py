@@ -1,16 +1,21 @@
 
+from datetime import timedelta
+
 from django_filters import rest_framework as filters
 from django_filters.rest_framework import FilterSet
 
+from apps.booking.availability import unavailable_rent_ids
+from apps.location.distance import ids_within
+from apps.location.geo import bounding_box_q, box_q, parse_bbox
+from apps.location.normalize import normalize_key
 from apps.rent.models import Rent
-from geopy.distance import distance
 from apps.rent.choices.room_type import RoomType
 
 
 
 class RentFilter(FilterSet):
-    city = filters.CharFilter(field_name='location__city', lookup_expr='iexact')
-    district = filters.CharFilter(field_name='location__district', lookup_expr='iexact')
+    city = filters.CharFilter(method='filter_by_name_key')
+    district = filters.CharFilter(method='filter_by_name_key')
     state = filters.CharFilter(field_name='location__state', lookup_expr='iexact')
 
     min_daily_price = filters.NumberFilter(field_name='daily_price', lookup_expr='gte')
@@ -22,6 +27,14 @@ class RentFilter(FilterSet):
     lat = filters.NumberFilter(method='filter_by_radius')
     lng = filters.NumberFilter(method='filter_by_radius')
     radius_km = filters.NumberFilter(method='filter_by_radius')
+    bbox = filters.CharFilter(method='filter_by_bbox', help_text="Map viewport as 'west,south,east,north'.")
+
+    check_in = filters.DateFilter(method='filter_by_availability', help_text="Arrival date (YYYY-MM-DD).")
+    check_out = filters.DateFilter(method='filter_by_availability', help_text="Departure date, defaults to one night.")
+    include_pending = filters.BooleanFilter(
+        method='filter_by_availability',
+        help_text="Also hide listings with pending requests for these dates."
+    )
 
     property_type = filters.ChoiceFilter(choices=[(rt.name, rt.value) for rt in RoomType])
 
@@ -29,7 +42,15 @@ class RentFilter(FilterSet):
         model = Rent
         fields = ['is_active', 'property_type']
 
+    def filter_by_name_key(self, queryset, name, value):
+        # Compare folded keys so case/accent-insensitive matches stay index seeks.
+        return queryset.filter(**{f'location__{name}_key': normalize_key(value)})
+
     def filter_by_radius(self, queryset, name, value):
+        # lat, lng and radius_km all route here; apply the search once.
+        if name != 'radius_km':
+            return queryset
+
         lat = self.data.get('lat')
         lng = self.data.get('lng')
         radius_km = self.data.get('radius_km')
@@ -40,21 +61,34 @@ class RentFilter(FilterSet):
                 lng = float(lng)
                 radius_km_val = float(radius_km)
 
-                queryset = queryset.filter(
-                    location__latitude__isnull=False,
-                    location__longitude__isnull=False
-                )
-
-                matched_ids = [
-                    rent.id for rent in queryset
-                    if distance(
-                        (lat, lng),
-                        (rent.location.latitude, rent.location.longitude)
-                    ).km <= radius_km_val
-                ]
+                candidates = queryset.filter(
+                    bounding_box_q(lat, lng, radius_km_val, prefix='location__')
+                ).values_list('id', 'location__latitude', 'location__longitude')
+
+                matched_ids = ids_within(lat, lng, list(candidates), radius_km_val)
                 return queryset.filter(id__in=matched_ids)
 
             except (TypeError, ValueError):
                 return queryset.none()
 
-        return queryset
\ No newline at end of file
+        return queryset
+
+    def filter_by_availability(self, queryset, name, value):
+        # check_in, check_out and include_pending all route here; apply the check once.
+        if name != 'check_in':
+            return queryset
+
+        check_out = self.form.cleaned_data.get('check_out') or value + timedelta(days=1)
+        if check_out <= value:
+            return queryset.none()
+
+        include_pending = bool(self.form.cleaned_data.get('include_pending'))
+        return queryset.exclude(id__in=unavailable_rent_ids(value, check_out, include_pending))
+
+    def filter_by_bbox(self, queryset, name, value):
+        try:
+            south, north, west, east = parse_bbox(value)
+        except ValueError:
+            return queryset.none()
+
+        return queryset.filter(box_q(south, north, west, east, prefix='location__'))
@@ -0,0 +1,90 @@
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.location.models import Location
+from apps.rent.fast_serializers import rent_rows, serialize_rent_rows
+from apps.rent.models import Rent
+from apps.rent.serializers import RentSerializer
+from apps.users.models import User
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare RentSerializer with the .values() fast path on one page of listings. "
+        "Synthetic data is created inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=100)
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options['page_size'], options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, page_size, repeat):
+        host = User.objects.create_user(
+            email="benchmark-host@example.com", full_name="Benchmark Host", password=None, is_host=True
+        )
+        location = Location.objects.create(city="Berlin", district="Mitte", latitude=52.52, longitude=13.405)
+        Rent.objects.bulk_create([
+            Rent(
+                owner=host, location=location, title=f"Benchmark listing {i}", description="Synthetic",
+                rooms=2, property_type="STUDIO", is_daily_available=True, daily_price=Decimal("55.00"),
+            )
+            for i in range(page_size)
+        ])
+        queryset = Rent.objects.select_related("owner", "location").filter(owner=host).order_by("-created_at")
+
+        def fetch_full():
+            return list(queryset[:page_size])
+
+        def fetch_fast():
+            return list(rent_rows(queryset)[:page_size])
+
+        def serialize_full(rents):
+            return RentSerializer(rents, many=True).data
+
+        def serialize_fast(rows):
+            return serialize_rent_rows(rows)
+
+        if [dict(item) for item in serialize_full(fetch_full())] != serialize_fast(fetch_fast()):
+            self.stderr.write(self.style.WARNING("Outputs differ: keep fast_serializers in sync with RentSerializer."))
+
+        results = {}
+        for name, fetch, serialize in (
+            ("RentSerializer", fetch_full, serialize_full),
+            ("fast path", fetch_fast, serialize_fast),
+        ):
+            fetch_seconds = serialize_seconds = 0.0
+            for _ in range(repeat):
+                started = time.perf_counter()
+                page = fetch()
+                fetched = time.perf_counter()
+                serialize(page)
+                fetch_seconds += fetched - started
+                serialize_seconds += time.perf_counter() - fetched
+            results[name] = (fetch_seconds / repeat, serialize_seconds / repeat)
+
+        self.stdout.write(f"{page_size}-item page, mean of {repeat} runs:")
+        for name, (fetch_seconds, serialize_seconds) in results.items():
+            self.stdout.write(
+                f"{name:<15} fetch {fetch_seconds * 1000:7.2f} ms   serialize {serialize_seconds * 1000:7.2f} ms   "
+                f"total {(fetch_seconds + serialize_seconds) * 1000:7.2f} ms"
+            )
+
+        full_fetch, full_serialize = results["RentSerializer"]
+        fast_fetch, fast_serialize = results["fast path"]
+        self.stdout.write(f"Serialization speedup: {full_serialize / fast_serialize:.1f}x")
+        self.stdout.write(f"End-to-end speedup:    {(full_fetch + full_serialize) / (fast_fetch + fast_serialize):.1f}x")
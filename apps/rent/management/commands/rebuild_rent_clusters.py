@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.rent.clusters import rebuild_all
+from apps.rent.models import RentClusterCell
+
+
+class Command(BaseCommand):
+    help = "Rebuild the map cluster aggregates for every precision from scratch."
+
+    def handle(self, *args, **options):
+        rebuild_all()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {RentClusterCell.objects.count()} cluster cells."
+        ))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from apps.rent.search import ensure_sqlite_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Recreate and repopulate the SQLite FTS5 index for listing search. "
+        "Needed after a migration rebuilds the rent_rent table, which drops its triggers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        if connections[options['database']].vendor != "sqlite":
+            self.stdout.write("Nothing to do: the MySQL FULLTEXT index is maintained by the database.")
+            return
+
+        ensure_sqlite_index(options['database'], force=True)
+        self.stdout.write(self.style.SUCCESS("Rebuilt the listing search index."))
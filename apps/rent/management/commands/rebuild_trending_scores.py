@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from apps.rent.trending import rebuild_scores
+
+
+class Command(BaseCommand):
+    help = "Recompute trending scores from recent hourly activity and prune old buckets."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--window-days', type=int, default=None,
+                            help="Days of activity to keep (default: TRENDING_WINDOW_DAYS).")
+
+    def handle(self, *args, **options):
+        scores, deleted = rebuild_scores(options['window_days'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {scores} trending scores, removed {deleted} old activity buckets."
+        ))
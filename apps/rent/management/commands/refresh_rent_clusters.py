@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.rent.clusters import refresh_dirty
+
+
+class Command(BaseCommand):
+    help = "Recompute the map cluster cells touched by listing changes since the last run."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--interval', type=int, default=0,
+                            help="Keep running and refresh every N seconds instead of once.")
+
+    def handle(self, *args, **options):
+        while True:
+            refreshed = refresh_dirty(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Refreshed {refreshed} cluster cells."))
+
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:00
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rent', '0011_rent_deleted_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RentClusterCell',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('precision', models.PositiveSmallIntegerField()),
+                ('geohash', models.CharField(max_length=12)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('latitude_sum', models.FloatField(default=0.0)),
+                ('longitude_sum', models.FloatField(default=0.0)),
+                ('priced_count', models.PositiveIntegerField(default=0)),
+                ('daily_price_sum', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('min_daily_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('precision', 'geohash'), name='rent_cluster_cell_unique')],
+            },
+        ),
+    ]
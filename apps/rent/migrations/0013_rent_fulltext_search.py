@@ -0,0 +1,69 @@
+from django.db import migrations
+
+MYSQL_FORWARD = "ALTER TABLE rent_rent ADD FULLTEXT INDEX rent_title_description_ft (title, description)"
+MYSQL_BACKWARD = "ALTER TABLE rent_rent DROP INDEX rent_title_description_ft"
+
+# Frozen copy of the FTS5 DDL as it was when this migration was written.
+# The live statements are apps.rent.search.SQLITE_FTS_STATEMENTS; do not
+# import this module from application code.
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS rent_rent_fts USING fts5(
+        title, description, content='rent_rent', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS rent_rent_fts_insert AFTER INSERT ON rent_rent BEGIN
+        INSERT INTO rent_rent_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS rent_rent_fts_delete AFTER DELETE ON rent_rent BEGIN
+        INSERT INTO rent_rent_fts(rent_rent_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS rent_rent_fts_update AFTER UPDATE OF title, description ON rent_rent BEGIN
+        INSERT INTO rent_rent_fts(rent_rent_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO rent_rent_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO rent_rent_fts(rent_rent_fts) VALUES ('rebuild')",
+]
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS rent_rent_fts_update",
+    "DROP TRIGGER IF EXISTS rent_rent_fts_delete",
+    "DROP TRIGGER IF EXISTS rent_rent_fts_insert",
+    "DROP TABLE IF EXISTS rent_rent_fts",
+]
+
+
+def create_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "mysql":
+        schema_editor.execute(MYSQL_FORWARD)
+    elif vendor == "sqlite":
+        for statement in SQLITE_FORWARD:
+            schema_editor.execute(statement)
+
+
+def drop_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "mysql":
+        schema_editor.execute(MYSQL_BACKWARD)
+    elif vendor == "sqlite":
+        for statement in SQLITE_BACKWARD:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rent', '0012_rentclustercell'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rent', '0013_rent_fulltext_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RentTrendingScore',
+            fields=[
+                ('rent', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trending', serialize=False, to='rent.rent')),
+                ('score', models.FloatField(db_index=True, default=0.0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RentActivityBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('bookings', models.PositiveIntegerField(default=0)),
+                ('rent', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity_buckets', to='rent.rent')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['hour'], name='rent_activity_hour_idx')],
+                'constraints': [models.UniqueConstraint(fields=('rent', 'hour'), name='rent_activity_bucket_unique')],
+            },
+        ),
+    ]
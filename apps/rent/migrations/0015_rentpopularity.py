@@ -0,0 +1,49 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_popularity(apps, schema_editor):
+    Rent = apps.get_model('rent', 'Rent')
+    RentPopularity = apps.get_model('rent', 'RentPopularity')
+    rows = Rent.objects.values_list(
+        'id', 'is_active', 'is_deleted', 'average_rating', 'ratings_count', 'view_count'
+    )
+    RentPopularity.objects.bulk_create(
+        [
+            RentPopularity(
+                rent_id=rent_id,
+                is_listed=is_active and not is_deleted,
+                average_rating=average_rating,
+                ratings_count=ratings_count,
+                view_count=view_count,
+            )
+            for rent_id, is_active, is_deleted, average_rating, ratings_count, view_count in rows.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rent', '0014_rent_trending'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RentPopularity',
+            fields=[
+                ('rent', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='popularity', serialize=False, to='rent.rent')),
+                ('is_listed', models.BooleanField(default=False)),
+                ('average_rating', models.FloatField(default=0.0)),
+                ('ratings_count', models.PositiveIntegerField(default=0)),
+                ('view_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['is_listed', '-average_rating', '-view_count', 'rent'], name='rent_popularity_rank_idx')],
+            },
+        ),
+        migrations.RunPython(populate_popularity, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('location', '0003_location_geohash'),
+        ('rent', '0015_rentpopularity'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rent',
+            index=models.Index(fields=['is_deleted', 'is_active', 'created_at', 'id'], name='rent_listed_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rent',
+            index=models.Index(fields=['is_deleted', 'is_active', 'daily_price', 'id'], name='rent_listed_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rent',
+            index=models.Index(fields=['owner', 'is_deleted', 'id'], name='rent_owner_listed_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rent', '0016_rent_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RentClusterDirtyCell',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('geohash', models.CharField(max_length=12, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:49
+
+import math
+
+from django.db import migrations, models
+
+
+def to_log_scores(apps, schema_editor):
+    RentTrendingScore = apps.get_model('rent', 'RentTrendingScore')
+    RentTrendingScore.objects.filter(score__lte=0).update(score=None)
+    rows = list(RentTrendingScore.objects.filter(score__isnull=False))
+    for row in rows:
+        row.score = math.log(row.score)
+    RentTrendingScore.objects.bulk_update(rows, ['score'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rent', '0017_cluster_dirty_cells'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='renttrendingscore',
+            name='score',
+            field=models.FloatField(db_index=True, help_text='Natural log of the forward-decayed activity, see apps.rent.trending.', null=True),
+        ),
+        migrations.RunPython(to_log_scores, migrations.RunPython.noop),
+    ]
@@ -87,6 +87,14 @@ class Rent(SoftDeleteModel):
     objects = RentManager()
     all_objects = models.Manager()
 
+    class Meta:
+        indexes = [
+            # Keyset pagination seeks on (key, id) within the listed rents.
+            models.Index(fields=['is_deleted', 'is_active', 'created_at', 'id'], name='rent_listed_created_idx'),
+            models.Index(fields=['is_deleted', 'is_active', 'daily_price', 'id'], name='rent_listed_price_idx'),
+            models.Index(fields=['owner', 'is_deleted', 'id'], name='rent_owner_listed_idx'),
+        ]
+
     def clean(self):
         if self.is_daily_available:
             if self.daily_price is None:
@@ -107,3 +115,82 @@ class Rent(SoftDeleteModel):
             return f"{self.title} — No location"
 
 
+
+
+class RentClusterCell(models.Model):
+    precision = models.PositiveSmallIntegerField()
+    geohash = models.CharField(max_length=12)
+
+    count = models.PositiveIntegerField(default=0)
+    latitude_sum = models.FloatField(default=0.0)
+    longitude_sum = models.FloatField(default=0.0)
+
+    priced_count = models.PositiveIntegerField(default=0)
+    daily_price_sum = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+    min_daily_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['precision', 'geohash'], name='rent_cluster_cell_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.geohash} ({self.count} listings)"
+
+
+class RentClusterDirtyCell(models.Model):
+    """A finest-precision cell whose aggregates must be recomputed by `refresh_rent_clusters`."""
+    geohash = models.CharField(max_length=12, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
+class RentActivityBucket(models.Model):
+    rent = models.ForeignKey(Rent, on_delete=models.CASCADE, related_name='activity_buckets')
+    hour = models.DateTimeField()
+    views = models.PositiveIntegerField(default=0)
+    bookings = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['rent', 'hour'], name='rent_activity_bucket_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['hour'], name='rent_activity_hour_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.rent_id} @ {self.hour:%Y-%m-%d %H}:00"
+
+
+class RentTrendingScore(models.Model):
+    rent = models.OneToOneField(Rent, on_delete=models.CASCADE, primary_key=True, related_name='trending')
+    score = models.FloatField(
+        null=True,
+        db_index=True,
+        help_text="Natural log of the forward-decayed activity, see apps.rent.trending."
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.rent_id}: {self.score}"
+
+
+class RentPopularity(models.Model):
+    rent = models.OneToOneField(Rent, on_delete=models.CASCADE, primary_key=True, related_name='popularity')
+    is_listed = models.BooleanField(default=False)
+    average_rating = models.FloatField(default=0.0)
+    ratings_count = models.PositiveIntegerField(default=0)
+    view_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['is_listed', '-average_rating', '-view_count', 'rent'],
+                name='rent_popularity_rank_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.rent_id}: {self.average_rating} ({self.view_count} views)"
@@ -0,0 +1,44 @@
+from apps.rent.models import Rent, RentPopularity
+
+# RentPopularity mirrors the columns `popular` sorts on, one row per rent, so the
+# endpoint reads the top of a single composite index instead of aggregating
+# ratings over every listing. Rows are refreshed whenever a rent is saved
+# (ratings update Rent.average_rating through a save) and after view flushes.
+POPULARITY_FIELDS = ['is_listed', 'average_rating', 'ratings_count', 'view_count']
+
+
+def refresh_popularity(rents, batch_size=1000):
+    """Upsert the popularity rows of every rent in the `rents` queryset."""
+    rows = rents.order_by().values_list(
+        'id', 'is_active', 'is_deleted', 'average_rating', 'ratings_count', 'view_count'
+    )
+    entries = [
+        RentPopularity(
+            rent_id=rent_id,
+            is_listed=is_active and not is_deleted,
+            average_rating=average_rating,
+            ratings_count=ratings_count,
+            view_count=view_count,
+        )
+        for rent_id, is_active, is_deleted, average_rating, ratings_count, view_count in rows
+    ]
+    RentPopularity.objects.bulk_create(
+        entries,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['rent'],
+        update_fields=POPULARITY_FIELDS,
+    )
+    return len(entries)
+
+
+def refresh_popularity_for(rent_ids):
+    return refresh_popularity(Rent.all_objects.filter(pk__in=list(rent_ids)))
+
+
+def popular_rent_ids(limit):
+    return list(
+        RentPopularity.objects.filter(is_listed=True)
+        .order_by('-average_rating', '-view_count', 'rent_id')
+        .values_list('rent_id', flat=True)[:limit]
+    )
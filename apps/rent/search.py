@@ -0,0 +1,116 @@
+import re
+
+from django.db import connection, connections
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+# Backing indexes are created by migration 0013_rent_fulltext_search:
+# a FULLTEXT index on MySQL and an external-content FTS5 table on SQLite.
+MYSQL_FULLTEXT_INDEX = "rent_title_description_ft"
+SQLITE_FTS_TABLE = "rent_rent_fts"
+
+# SQLite drops the triggers of a table it rebuilds, which it does for many
+# ALTERs in later migrations. ensure_sqlite_index() runs after every migrate
+# and recreates whatever is missing, then rebuilds the index; the
+# rebuild_search_index command forces that. This is the only live copy of the
+# DDL: migration 0013 keeps its own frozen one.
+SQLITE_FTS_STATEMENTS = {
+    SQLITE_FTS_TABLE: f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5(
+            title, description, content='rent_rent', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+        )
+    """,
+    f"{SQLITE_FTS_TABLE}_insert": f"""
+        CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_insert AFTER INSERT ON rent_rent BEGIN
+            INSERT INTO {SQLITE_FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+        END
+    """,
+    f"{SQLITE_FTS_TABLE}_delete": f"""
+        CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_delete AFTER DELETE ON rent_rent BEGIN
+            INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+        END
+    """,
+    f"{SQLITE_FTS_TABLE}_update": f"""
+        CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_update AFTER UPDATE OF title, description ON rent_rent BEGIN
+            INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+            INSERT INTO {SQLITE_FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+        END
+    """,
+}
+
+
+def ensure_sqlite_index(using="default", force=False):
+    """
+    Recreate the SQLite FTS table and triggers if any are missing, or always
+    with `force`, and repopulate the index. Returns True if it did.
+    """
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return False
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        present = {name for (name,) in cursor.fetchall()}
+        if "rent_rent" not in present or (set(SQLITE_FTS_STATEMENTS) <= present and not force):
+            return False
+        for statement in SQLITE_FTS_STATEMENTS.values():
+            cursor.execute(statement)
+        cursor.execute(f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')")
+    return True
+
+
+def _terms(query):
+    return re.findall(r"\w+", query)
+
+
+def _no_matches(queryset):
+    return queryset.annotate(relevance=Value(0.0, output_field=FloatField())).none()
+
+
+def _mysql_search(queryset, query):
+    relevance = RawSQL(
+        "MATCH (rent_rent.title, rent_rent.description) AGAINST (%s IN NATURAL LANGUAGE MODE)",
+        (query,),
+    )
+    return queryset.annotate(relevance=relevance).filter(relevance__gt=0)
+
+
+def _sqlite_search(queryset, query):
+    fts_query = " ".join(f'"{term}"' for term in _terms(query))
+    if not fts_query:
+        return _no_matches(queryset)
+
+    # Both the match and the ranking are part of the main query, so other
+    # filters and the page limit apply to every match.
+    matches = RawSQL(f"SELECT rowid FROM {SQLITE_FTS_TABLE} WHERE {SQLITE_FTS_TABLE} MATCH %s", (fts_query,))
+    relevance = RawSQL(
+        f"(SELECT -bm25({SQLITE_FTS_TABLE}) FROM {SQLITE_FTS_TABLE} "
+        f"WHERE {SQLITE_FTS_TABLE} MATCH %s AND rowid = rent_rent.id)",
+        (fts_query,),
+        output_field=FloatField(),
+    )
+    return queryset.filter(id__in=matches).annotate(relevance=relevance)
+
+
+def _fallback_search(queryset, query):
+    condition = Q()
+    for term in _terms(query):
+        condition &= Q(title__icontains=term) | Q(description__icontains=term)
+    return queryset.filter(condition).annotate(relevance=Value(0.0, output_field=FloatField()))
+
+
+def search_rents(queryset, query):
+    """
+    Narrow `queryset` to listings whose title or description match `query`,
+    annotated with `relevance` and ordered best match first.
+    """
+    if connection.vendor == "mysql":
+        queryset = _mysql_search(queryset, query)
+    elif connection.vendor == "sqlite":
+        queryset = _sqlite_search(queryset, query)
+    else:
+        queryset = _fallback_search(queryset, query)
+
+    return queryset.order_by("-relevance", "-created_at", "-id")
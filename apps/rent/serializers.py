@@ -2,11 +2,42 @@ from decimal import Decimal
 
 from rest_framework import serializers
 
+from apps.booking.models import Booking
 from apps.location.serializers import LocationSerializer
+from apps.rent.cache import invalidate_on_commit
+from apps.rent.clusters import mark_dirty
+from apps.rent.popularity import refresh_popularity
 from apps.rent.models import Rent
 from apps.users.serializers import UserProfileSerializer
 
 
+def renter_ids_by_rent(rent_ids):
+    renter_ids = {rent_id: [] for rent_id in rent_ids}
+    rows = (
+        Booking.objects.filter(rent_id__in=rent_ids)
+        .order_by('rent_id', 'renter_id')
+        .values_list('rent_id', 'renter_id')
+        .distinct()
+    )
+    for rent_id, renter_id in rows:
+        renter_ids[rent_id].append(renter_id)
+    return renter_ids
+
+
+class RentListSerializer(serializers.ListSerializer):
+    """Loads renter ids for the whole page in one query instead of one per listing."""
+
+    def to_representation(self, data):
+        rents = list(data.all() if hasattr(data, 'all') else data)
+
+        renter_ids = self.context.setdefault('renter_ids', {})
+        missing = [rent.pk for rent in rents if rent.pk not in renter_ids]
+        if missing:
+            renter_ids.update(renter_ids_by_rent(missing))
+
+        return super().to_representation(rents)
+
+
 class RentSerializer(serializers.ModelSerializer):
     owner = UserProfileSerializer(read_only=True)
     location = LocationSerializer(read_only=True)
@@ -17,10 +48,13 @@ class RentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Rent
         fields = "__all__"
+        list_serializer_class = RentListSerializer
 
     def get_renter_ids(self, obj):
-        renters = obj.bookings.values_list('renter_id', flat=True).distinct()
-        return list(renters)
+        renter_ids = self.context.get('renter_ids', {})
+        if obj.pk in renter_ids:
+            return renter_ids[obj.pk]
+        return renter_ids_by_rent([obj.pk])[obj.pk]
 
     def get_request_user_id(self, obj):
         user = self.context.get("request").user
@@ -109,5 +143,10 @@ class BulkCreateRentSerializer(serializers.Serializer):
             for data in rents_data
         ]
 
-        return Rent.objects.bulk_create(rents)
+        rents = Rent.objects.bulk_create(rents)
+        mark_dirty({rent.location.geohash for rent in rents})
+        # bulk_create does not return primary keys on every backend.
+        refresh_popularity(Rent.all_objects.filter(owner=user, popularity__isnull=True))
+        invalidate_on_commit()
+        return rents
 
@@ -1,12 +1,93 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_save
 from django.dispatch import receiver
+
+from apps.location.models import Location
+from apps.notifications import outbox
+from apps.rent.cache import invalidate_on_commit
+from apps.rent.clusters import mark_dirty
 from apps.rent.models import Rent
+from apps.rent.popularity import refresh_popularity_for
+from apps.rent.search import ensure_sqlite_index
+
+CLUSTER_FIELDS = ('location_id', 'is_active', 'is_deleted', 'daily_price')
 
 
 @receiver(post_save, sender=Rent)
 def notify_host_on_rent_creation(sender, instance, created, **kwargs):
     if created:
-        print(
-            f"[📢 NOTIFICATION] Host '{instance.owner.email}' has created a new listing: '{instance.title}' "
-            f"in {instance.location.city}, {instance.location.district or ''}"
+        outbox.add_host_event(
+            'rent_created', instance.owner.email, f"Your listing '{instance.title}' is live",
+            f"Host '{instance.owner.email}' has created a new listing: '{instance.title}' "
+            f"in {instance.location.city}, {instance.location.district or ''}",
+            title=instance.title, city=instance.location.city,
         )
+
+
+def _geohashes_for(location_ids):
+    return set(Location.objects.filter(pk__in=location_ids).values_list('geohash', flat=True))
+
+
+@receiver(pre_save, sender=Rent)
+def remember_rent_cluster_state(sender, instance, raw, **kwargs):
+    instance._cluster_state = None
+    if instance.pk and not raw:
+        instance._cluster_state = Rent.all_objects.filter(pk=instance.pk).values(*CLUSTER_FIELDS).first()
+
+
+@receiver(post_save, sender=Rent)
+def refresh_rent_clusters(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+
+    before = getattr(instance, '_cluster_state', None)
+    location_ids = {instance.location_id}
+    if before is not None:
+        if all(before[field] == getattr(instance, field) for field in CLUSTER_FIELDS):
+            return
+        location_ids.add(before['location_id'])
+
+    mark_dirty(_geohashes_for(location_ids))
+
+
+@receiver(post_delete, sender=Rent)
+def refresh_clusters_on_rent_delete(sender, instance, **kwargs):
+    mark_dirty(_geohashes_for([instance.location_id]))
+
+
+@receiver(pre_save, sender=Location)
+def remember_location_geohash(sender, instance, raw, **kwargs):
+    instance._previous_geohash = None
+    if instance.pk and not raw:
+        instance._previous_geohash = Location.objects.filter(pk=instance.pk).values_list('geohash', flat=True).first()
+
+
+@receiver(post_save, sender=Location)
+def refresh_clusters_on_location_move(sender, instance, created, raw, **kwargs):
+    previous = getattr(instance, '_previous_geohash', None)
+    if raw or created or previous == instance.geohash:
+        return
+
+    mark_dirty({previous, instance.geohash})
+
+
+@receiver(post_save, sender=Rent)
+@receiver(post_delete, sender=Rent)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_rent_responses(sender, **kwargs):
+    invalidate_on_commit()
+
+
+@receiver(post_save, sender=Rent)
+def refresh_rent_popularity(sender, instance, raw, **kwargs):
+    if raw:
+        return
+    rent_id = instance.pk
+    transaction.on_commit(lambda: refresh_popularity_for([rent_id]))
+
+
+@receiver(post_migrate)
+def ensure_rent_search_index(sender, using, **kwargs):
+    if sender.name == 'apps.rent':
+        ensure_sqlite_index(using)
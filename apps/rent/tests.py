@@ -0,0 +1,639 @@
+import math
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock, skipUnless
+
+from django.db import DatabaseError, connection
+from django.db.models import F
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from geopy.distance import geodesic
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from apps.booking.models import Booking, RentNight
+from apps.location.models import Location
+from apps.rent import trending, view_counts
+from apps.rent.clusters import refresh_dirty
+from apps.rent.fast_serializers import rent_rows, serialize_rent_rows
+from apps.rent.models import Rent, RentActivityBucket, RentClusterDirtyCell, RentTrendingScore
+from apps.rent.search import ensure_sqlite_index
+from apps.rent.serializers import RentSerializer
+from apps.users.models import User
+
+
+class RentTestMixin:
+
+    def setUp(self):
+        self.host = User.objects.create_user(
+            email="host@example.com", full_name="Host", password="pass12345", is_host=True
+        )
+        self.renter = User.objects.create_user(
+            email="renter@example.com", full_name="Renter", password="pass12345"
+        )
+        self.location = Location.objects.create(
+            city="Berlin", district="Mitte", latitude=52.52, longitude=13.405
+        )
+
+    def create_rents(self, count):
+        start = date.today() + timedelta(days=10)
+        for i in range(count):
+            with self.captureOnCommitCallbacks(execute=True):
+                rent = Rent.objects.create(
+                    owner=self.host,
+                    location=self.location,
+                    title=f"Listing {i}",
+                    description="Bright flat",
+                    rooms=2,
+                    property_type="STUDIO",
+                    is_daily_available=True,
+                    daily_price=Decimal("50.00"),
+                )
+            Booking.objects.create(
+                renter=self.renter, rent=rent, start_date=start, end_date=start + timedelta(days=2)
+            )
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+class RentListQueryCountTests(RentTestMixin, APITestCase):
+    """List endpoints must run the same number of queries whatever the page size."""
+
+    def count_queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def assert_constant_queries(self, url, params=None):
+        self.create_rents(2)
+        small, _ = self.count_queries(url, params)
+
+        self.create_rents(6)
+        large, response = self.count_queries(url, params)
+
+        self.assertEqual(small, large)
+        return response
+
+    def test_rent_viewset_list(self):
+        response = self.assert_constant_queries(reverse("rent-list"))
+        self.assertEqual(response.data["results"][0]["renter_ids"], [self.renter.id])
+
+    def test_popular(self):
+        response = self.assert_constant_queries(reverse("rent-popular"), {"limit": "100"})
+        self.assertEqual(len(response.data), 8)
+
+    def test_active_list(self):
+        self.assert_constant_queries(reverse("rent-list-active"))
+
+    def test_by_location(self):
+        self.assert_constant_queries(reverse("rents-by-location"), {"city": "Berlin"})
+
+    def test_my_rents(self):
+        self.client.force_authenticate(self.host)
+        self.assert_constant_queries(reverse("my-rents"))
+
+    def test_locations_with_rents(self):
+        response = self.assert_constant_queries(reverse("locations-with-rents"))
+        self.assertEqual(response.data[0]["rents"][0]["renter_ids"], [self.renter.id])
+
+
+class RentFastSerializerTests(RentTestMixin, APITestCase):
+    """The list fast path must render exactly what RentSerializer renders."""
+
+    def test_fast_rows_match_rent_serializer(self):
+        self.create_rents(3)
+        bare = Location.objects.create(city="Hamburg", latitude=53.55, longitude=9.99)
+        Rent.objects.filter(title="Listing 0").update(
+            is_monthly_available=True, monthly_price=Decimal("1234.50"), average_rating=4.5, ratings_count=2,
+        )
+        Rent.objects.filter(title="Listing 1").update(daily_price=None, location=bare)
+        Rent.objects.filter(title="Listing 2").update(deleted_at=timezone.now())
+
+        queryset = Rent.objects.select_related("owner", "location").order_by("-created_at", "-id")
+        fast = serialize_rent_rows(rent_rows(queryset))
+        slow = RentSerializer(queryset, many=True).data
+
+        renderer = JSONRenderer()
+        self.assertEqual(renderer.render(fast), renderer.render(slow))
+
+
+class RentResponseCacheTests(RentTestMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.create_rents(2)
+
+    def test_anonymous_list_is_served_from_cache(self):
+        url = reverse("rent-list")
+        first = self.client.get(url, {"b": "2", "a": "1"})
+
+        with self.assertNumQueries(0):
+            second = self.client.get(url, {"a": "1", "b": "2"})
+
+        self.assertEqual(first.data, second.data)
+
+    def test_rent_write_invalidates_cached_list(self):
+        url = reverse("rent-list")
+        self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Rent.objects.filter(title="Listing 0").get().save()
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url)
+        self.assertGreater(len(ctx.captured_queries), 0)
+
+    def test_authenticated_requests_bypass_cache(self):
+        url = reverse("rent-detail", args=[Rent.objects.first().pk])
+        self.client.get(url)
+        self.client.force_authenticate(self.renter)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url)
+        self.assertGreater(len(ctx.captured_queries), 0)
+
+
+class RentViewCounterTests(RentTestMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        view_counts.flush()
+        self.create_rents(2)
+
+    def test_views_are_buffered_and_flushed_in_batches(self):
+        first, second = Rent.objects.order_by("id")
+        updated_at = first.updated_at
+        self.client.force_authenticate(self.renter)
+
+        with override_settings(VIEW_COUNT_FLUSH_INTERVAL=3600):
+            for rent, hits in ((first, 3), (second, 1)):
+                for _ in range(hits):
+                    url = reverse("rent-increment-view", args=[rent.pk])
+                    self.assertEqual(self.client.post(url).status_code, 200)
+
+        first.refresh_from_db()
+        self.assertEqual(first.view_count, 0)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(view_counts.flush(), {first.pk: 3, second.pk: 1})
+        rent_update = f"UPDATE {connection.ops.quote_name(Rent._meta.db_table)}"
+        rent_updates = [q for q in ctx.captured_queries if q["sql"].startswith(rent_update)]
+        self.assertEqual(len(rent_updates), 2)
+        self.assertEqual(
+            dict(RentActivityBucket.objects.values_list("rent_id", "views")), {first.pk: 3, second.pk: 1}
+        )
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.view_count, second.view_count), (3, 1))
+        self.assertEqual(first.popularity.view_count, 3)
+        self.assertEqual(first.updated_at, updated_at)
+
+    def test_failed_flush_keeps_the_views(self):
+        rent = Rent.objects.first()
+        with override_settings(VIEW_COUNT_FLUSH_INTERVAL=3600):
+            view_counts.record_view(rent.pk)
+
+        with mock.patch.object(Rent.all_objects, "filter", side_effect=DatabaseError("gone away")):
+            with self.assertLogs("rental", "ERROR"):
+                self.assertEqual(view_counts.flush(), {})
+        self.assertEqual(view_counts.pending_views(rent.pk), 1)
+        self.assertEqual(view_counts.flush(), {rent.pk: 1})
+
+
+class RentKeysetPaginationTests(RentTestMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.create_rents(25)
+        # Ties on both keys, so the pages have to seek on (key, id).
+        base = timezone.now() - timedelta(days=1)
+        for index, rent in enumerate(Rent.objects.order_by("id")):
+            Rent.objects.filter(pk=rent.pk).update(
+                created_at=base + timedelta(minutes=index // 3),
+                daily_price=Decimal(40 + 10 * (index % 3)),
+            )
+        Rent.objects.filter(title__in=["Listing 3", "Listing 4"]).update(daily_price=None)
+
+    def walk(self, url, params):
+        """Follow `next` to the end, then `previous` back to the start; return the ids in page order."""
+        pages = []
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("count", response.data)
+            pages.append([item["id"] for item in response.data["results"]])
+            url, params, last = response.data["next"], None, response
+
+        back, url = [], last.data["previous"]
+        while url:
+            response = self.client.get(url)
+            back.insert(0, [item["id"] for item in response.data["results"]])
+            url = response.data["previous"]
+        self.assertEqual(back, pages[:-1])
+        return [pk for page in pages for pk in page]
+
+    def test_daily_price_pages_with_null_prices_and_ties(self):
+        url = reverse("rents-by-location")
+        ascending = list(
+            Rent.objects.order_by(F("daily_price").asc(nulls_first=True), "id").values_list("id", flat=True)
+        )
+        descending = list(
+            Rent.objects.order_by(F("daily_price").desc(nulls_last=True), "-id").values_list("id", flat=True)
+        )
+        self.assertEqual(self.walk(url, {"ordering": "daily_price", "cursor": "", "page_size": 4}), ascending)
+        self.assertEqual(self.walk(url, {"ordering": "-daily_price", "cursor": "", "page_size": 4}), descending)
+
+    def test_created_at_pages_with_ties(self):
+        expected = list(Rent.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+        self.assertEqual(self.walk(reverse("rent-list-active"), {"cursor": "", "page_size": 4}), expected)
+        self.assertEqual(self.walk(reverse("rents-by-location"), {"cursor": "", "page_size": 4}), expected)
+
+    def test_my_rents_pages_by_id(self):
+        self.client.force_authenticate(self.host)
+        expected = list(Rent.objects.order_by("id").values_list("id", flat=True))
+        self.assertEqual(self.walk(reverse("my-rents"), {"cursor": "", "page_size": 4}), expected)
+
+    def test_page_parameter_keeps_page_number_mode(self):
+        self.client.force_authenticate(self.host)
+        for name in ("rents-by-location", "rent-list-active", "my-rents"):
+            response = self.client.get(reverse(name), {"page": 2})
+            self.assertEqual(response.data["count"], 25)
+            self.assertEqual(len(response.data["results"]), 10)
+
+    def test_page_number_mode_is_the_default(self):
+        response = self.client.get(reverse("rents-by-location"))
+        self.assertEqual(response.data["count"], 25)
+        self.assertIn("page=2", response.data["next"])
+
+    def test_invalid_cursor_is_404(self):
+        response = self.client.get(reverse("rent-list-active"), {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 404)
+
+
+class RentAvailabilityFilterTests(RentTestMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.create_rents(3)
+        self.start = date.today() + timedelta(days=10)
+        self.pending, self.confirmed, self.free = Rent.objects.order_by("id")
+        booking = Booking.objects.get(rent=self.confirmed)
+        booking.status = "confirmed"
+        booking.save()
+        Booking.objects.filter(rent=self.free).get().delete()
+
+    def available(self, **params):
+        response = self.client.get(reverse("rent-list-active"), params)
+        self.assertEqual(response.status_code, 200)
+        return {item["id"] for item in response.data["results"]}
+
+    def test_confirmed_overlap_is_excluded(self):
+        ids = self.available(check_in=self.start + timedelta(days=1), check_out=self.start + timedelta(days=5))
+        self.assertEqual(ids, {self.pending.id, self.free.id})
+
+    def test_pending_overlap_is_excluded_on_request(self):
+        ids = self.available(check_in=self.start, include_pending="true")
+        self.assertEqual(ids, {self.free.id})
+
+    def test_expired_hold_does_not_hide_the_listing(self):
+        Booking.objects.filter(rent=self.pending).update(hold_expires_at=timezone.now() - timedelta(minutes=1))
+        ids = self.available(check_in=self.start, include_pending="true")
+        self.assertEqual(ids, {self.pending.id, self.free.id})
+
+    def test_checkout_day_is_free(self):
+        ids = self.available(check_in=self.start + timedelta(days=2), check_out=self.start + timedelta(days=4))
+        self.assertEqual(ids, {self.pending.id, self.confirmed.id, self.free.id})
+
+    def test_cancelled_booking_releases_nights(self):
+        booking = Booking.objects.get(rent=self.confirmed)
+        booking.status = "cancelled"
+        booking.save()
+        self.assertEqual(len(self.available(check_in=self.start)), 3)
+
+    def test_nights_are_only_rebuilt_when_dates_or_status_change(self):
+        booking = Booking.objects.get(rent=self.confirmed)
+        nights = set(RentNight.objects.filter(booking=booking).values_list("id", flat=True))
+        booking.save()
+        self.assertEqual(set(RentNight.objects.filter(booking=booking).values_list("id", flat=True)), nights)
+
+        booking.end_date += timedelta(days=1)
+        booking.save()
+        self.assertEqual(RentNight.objects.filter(booking=booking).count(), len(nights) + 1)
+
+
+class RentCalendarTests(RentTestMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.create_rents(1)
+        self.rent = Rent.objects.get()
+        self.year = date.today().year + 1
+        self.booking = Booking.objects.get()
+        self.booking.start_date = date(self.year, 3, 30)
+        self.booking.end_date = date(self.year, 4, 2)
+        self.booking.save()
+
+    def calendar(self):
+        url = reverse("rent-calendar", args=[self.rent.pk])
+        response = self.client.get(url, {"start": f"{self.year}-03", "months": 2})
+        self.assertEqual(response.status_code, 200)
+        return [(month["month"], month["booked"], month["held"]) for month in response.data["months"]]
+
+    def test_calendar_follows_booking_lifecycle(self):
+        self.assertEqual(self.calendar(), [
+            (f"{self.year}-03", [], [30, 31]),
+            (f"{self.year}-04", [], [1]),
+        ])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.booking.status = "confirmed"
+            self.booking.save()
+        self.assertEqual(self.calendar(), [
+            (f"{self.year}-03", [30, 31], []),
+            (f"{self.year}-04", [1], []),
+        ])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.booking.status = "cancelled"
+            self.booking.save()
+        self.assertEqual(self.calendar(), [
+            (f"{self.year}-03", [], []),
+            (f"{self.year}-04", [], []),
+        ])
+
+
+def offset(lat, lng, bearing, km):
+    """The point `km` away from (lat, lng) in direction `bearing` (degrees) on a sphere."""
+    lat, lng, bearing = map(math.radians, (lat, lng, bearing))
+    angle = km / 6371.0088
+    lat2 = math.asin(math.sin(lat) * math.cos(angle) + math.cos(lat) * math.sin(angle) * math.cos(bearing))
+    lng2 = lng + math.atan2(
+        math.sin(bearing) * math.sin(angle) * math.cos(lat), math.cos(angle) - math.sin(lat) * math.sin(lat2)
+    )
+    return math.degrees(lat2), math.degrees(lng2)
+
+
+class RentRadiusFilterTests(RentTestMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.create_rents(2)
+
+    def test_locations_without_geohash_are_still_found(self):
+        Location.objects.update(geohash="")
+        response = self.client.get(reverse("rent-list"), {"lat": 52.52, "lng": 13.40, "radius_km": 5})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 2)
+
+        response = self.client.get(reverse("rent-list"), {"lat": 48.14, "lng": 11.58, "radius_km": 5})
+        self.assertEqual(len(response.data["results"]), 0)
+
+    def test_matches_a_full_geodesic_scan_at_the_edge_of_the_circle(self):
+        center, radius = (52.52, 13.405), 20
+        placed = {
+            # bearing, km from the center
+            "north inside": (0, radius - 0.5), "north outside": (0, radius + 0.5),
+            "east inside": (90, radius - 0.5), "east outside": (90, radius + 0.5),
+            "south inside": (180, radius - 0.5), "west outside": (270, radius + 0.5),
+            "diagonal inside": (45, radius - 0.5), "diagonal outside": (225, radius + 0.5),
+            # Inside the bounding box, but outside the circle.
+            "box corner": (135, radius * 1.35),
+        }
+        for title, (bearing, km) in placed.items():
+            lat, lng = offset(*center, bearing, km)
+            location = Location.objects.create(city="Berlin", latitude=lat, longitude=lng)
+            Rent.objects.create(
+                owner=self.host, location=location, title=title, description="Flat", rooms=1,
+                property_type="STUDIO", is_daily_available=True, daily_price=Decimal("50.00"),
+            )
+        Location.objects.filter(rents__title="east inside").update(geohash="")
+
+        # The previous implementation: geopy distance over every listing.
+        expected = {
+            rent.title for rent in Rent.objects.select_related("location")
+            if geodesic(center, (rent.location.latitude, rent.location.longitude)).km <= radius
+        }
+        self.assertEqual(
+            expected,
+            {"Listing 0", "Listing 1", "north inside", "east inside", "south inside", "diagonal inside"},
+        )
+
+        response = self.client.get(
+            reverse("rent-list-active"), {"lat": center[0], "lng": center[1], "radius_km": radius, "page_size": 100}
+        )
+        self.assertEqual({item["title"] for item in response.data["results"]}, expected)
+
+
+def haversine(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * 6371.0088 * math.asin(math.sqrt(a))
+
+
+class RentNearestTests(RentTestMixin, APITestCase):
+    ORIGIN = (52.52, 13.405)
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        # Created out of distance order, one far enough to need several rounds.
+        self.points = [(52.70, 13.405), (52.521, 13.41), (48.14, 11.58), (52.40, 13.20), (52.52, 13.9)]
+        for index, (lat, lng) in enumerate(self.points):
+            location = Location.objects.create(city="Berlin", latitude=lat, longitude=lng)
+            Rent.objects.create(
+                owner=self.host, location=location, title=f"Point {index}", description="Flat",
+                rooms=1, property_type="STUDIO", is_daily_available=True, daily_price=Decimal("50.00"),
+            )
+        Rent.objects.create(
+            owner=self.host, location=self.location, title="Inactive", description="Flat", rooms=1,
+            property_type="STUDIO", is_daily_available=True, daily_price=Decimal("50.00"), is_active=False,
+        )
+
+    def nearest(self, **params):
+        return self.client.get(reverse("rent-nearest"), params)
+
+    def test_results_are_sorted_with_distances(self):
+        response = self.nearest(lat=self.ORIGIN[0], lng=self.ORIGIN[1], k=10)
+        self.assertEqual(response.status_code, 200)
+
+        expected = sorted(
+            (haversine(*self.ORIGIN, lat, lng), f"Point {index}") for index, (lat, lng) in enumerate(self.points)
+        )
+        self.assertEqual([item["title"] for item in response.data], [title for _, title in expected])
+        for item, (km, _) in zip(response.data, expected):
+            self.assertAlmostEqual(item["distance_km"], km, places=2)
+
+    def test_k_is_clamped(self):
+        with mock.patch("apps.rent.views.NEAREST_MAX_RESULTS", 2):
+            response = self.nearest(lat=self.ORIGIN[0], lng=self.ORIGIN[1], k=100)
+        self.assertEqual([item["title"] for item in response.data], ["Point 1", "Point 3"])
+        self.assertEqual(len(self.nearest(lat=self.ORIGIN[0], lng=self.ORIGIN[1], k=0).data), 1)
+
+    def test_bad_coordinates_are_rejected(self):
+        for params in ({}, {"lat": 52.5}, {"lat": "north", "lng": 13.4}, {"lat": 91, "lng": 13.4},
+                       {"lat": 52.5, "lng": -181}, {"lat": 52.5, "lng": 13.4, "k": "many"}):
+            self.assertEqual(self.nearest(**params).status_code, 400, params)
+
+
+class RentClusterTests(RentTestMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.create_rents(2)
+        refresh_dirty()
+
+    def clusters(self, bbox, zoom):
+        response = self.client.get(reverse("rent-clusters"), {"bbox": bbox, "zoom": zoom})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_listing_changes_are_applied_by_the_refresh(self):
+        cells = self.clusters("13.0,52.3,13.8,52.7", 10)
+        self.assertEqual([cell["count"] for cell in cells], [2])
+        self.assertEqual(len(cells[0]["geohash"]), 4)
+
+        Rent.objects.filter(title="Listing 0").get().delete()
+        self.assertEqual(self.clusters("13.0,52.3,13.8,52.7", 10)[0]["count"], 2)
+        refresh_dirty()
+        self.assertEqual(self.clusters("13.0,52.3,13.8,52.7", 10)[0]["count"], 1)
+
+    def test_moving_and_deactivating_mark_cells_dirty(self):
+        berlin = "13.0,52.3,13.8,52.7"
+        munich = "11.3,48.0,11.9,48.3"
+        self.assertFalse(RentClusterDirtyCell.objects.exists())
+
+        moved = Rent.objects.get(title="Listing 0")
+        moved.location = Location.objects.create(city="Munich", latitude=48.14, longitude=11.58)
+        moved.save()
+        dirty = set(RentClusterDirtyCell.objects.values_list("geohash", flat=True))
+        self.assertEqual(
+            {cell[:4] for cell in dirty}, {self.location.geohash[:4], moved.location.geohash[:4]},
+        )
+        # Stale until the refresh runs.
+        self.assertEqual(self.clusters(berlin, 10)[0]["count"], 2)
+        self.assertEqual(self.clusters(munich, 10), [])
+
+        self.assertEqual(refresh_dirty(), len(dirty))
+        self.assertFalse(RentClusterDirtyCell.objects.exists())
+        self.assertEqual([cell["count"] for cell in self.clusters(berlin, 10)], [1])
+        self.assertEqual([cell["count"] for cell in self.clusters(munich, 10)], [1])
+
+        deactivated = Rent.objects.get(title="Listing 1")
+        deactivated.is_active = False
+        deactivated.save()
+        self.assertEqual(self.clusters(berlin, 10)[0]["count"], 1)
+        refresh_dirty()
+        self.assertEqual(self.clusters(berlin, 10), [])
+
+    def test_large_viewport_is_served_at_coarse_precision(self):
+        cells = self.clusters("-180,-90,180,90", 22)
+        self.assertEqual([(len(cell["geohash"]), cell["count"]) for cell in cells], [(2, 2)])
+
+
+class RentSearchTests(RentTestMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.create_rents(3)
+        munich = Location.objects.create(city="Munich", district="Altstadt", latitude=48.14, longitude=11.58)
+        Rent.objects.filter(title="Listing 0").update(title="Sunny sunny loft", description="Sunny balcony")
+        Rent.objects.filter(title="Listing 1").update(title="Sunny flat", location=munich)
+
+    def search(self, **params):
+        return self.client.get(reverse("rent-search"), params)
+
+    def test_matches_are_ranked_and_filtered(self):
+        response = self.search(q="sunny")
+        self.assertEqual([item["title"] for item in response.data["results"]], ["Sunny sunny loft", "Sunny flat"])
+
+        response = self.search(q="sunny", city="Munich")
+        self.assertEqual([item["title"] for item in response.data["results"]], ["Sunny flat"])
+
+    def test_invalid_filter_is_rejected(self):
+        self.assertEqual(self.search(q="sunny", min_daily_price="cheap").status_code, 400)
+
+    @skipUnless(connection.vendor == "sqlite", "SQLite keeps the index up to date with triggers")
+    def test_missing_sqlite_triggers_are_restored(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TRIGGER rent_rent_fts_update")
+        Rent.objects.filter(title="Listing 2").update(title="Quiet studio")
+        self.assertTrue(ensure_sqlite_index())
+        self.assertEqual(len(self.search(q="quiet").data["results"]), 1)
+
+    @skipUnless(connection.vendor == "sqlite", "SQLite keeps the index up to date with triggers")
+    def test_rebuild_command_repopulates_the_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM rent_rent_fts")
+        self.assertEqual(len(self.search(q="sunny").data["results"]), 0)
+        call_command("rebuild_search_index", stdout=mock.MagicMock())
+        self.assertEqual(len(self.search(q="sunny").data["results"]), 2)
+
+
+class RentFacetTests(RentTestMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.create_rents(3)
+        spelled = Location.objects.create(city="berlin ", district="Mitte", latitude=52.52, longitude=13.405)
+        munich = Location.objects.create(city="Munich", latitude=48.14, longitude=11.58)
+        Rent.objects.filter(title="Listing 1").update(location=spelled)
+        Rent.objects.filter(title="Listing 2").update(location=munich, daily_price=Decimal("150.00"))
+
+    def test_city_facet_matches_city_filter(self):
+        response = self.client.get(reverse("rent-list-active"))
+        cities = {row["key"]: row["count"] for row in response.data["facets"]["city"]}
+        self.assertEqual(cities, {"berlin": 2, "munich": 1})
+        self.assertEqual(
+            {row["value"]: row["count"] for row in response.data["facets"]["daily_price"]},
+            {"0-50": 0, "50-100": 2, "100-200": 1, "200+": 0},
+        )
+
+        filtered = self.client.get(reverse("rent-list-active"), {"city": "Berlin"})
+        self.assertEqual(len(filtered.data["results"]), cities["berlin"])
+
+
+class RentTrendingTests(RentTestMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.create_rents(2)
+        self.old, self.new = Rent.objects.order_by("id")
+
+    def ranking(self):
+        response = self.client.get(reverse("rent-trending"))
+        self.assertEqual(response.status_code, 200)
+        return [item["id"] for item in response.data]
+
+    @override_settings(TRENDING_HALF_LIFE_HOURS=24)
+    def test_recent_activity_outranks_older_activity(self):
+        now = timezone.now()
+        trending.record_views({self.old.pk: 10}, moment=now - timedelta(days=3))
+        trending.record_views({self.new.pk: 2}, moment=now)
+        self.assertEqual(self.ranking(), [self.new.pk, self.old.pk])
+
+        trending.record_views({self.old.pk: 20}, moment=now)
+        cache.clear()
+        self.assertEqual(self.ranking(), [self.old.pk, self.new.pk])
+
+    @override_settings(TRENDING_HALF_LIFE_HOURS=1)
+    def test_scores_stay_finite_far_from_the_epoch(self):
+        moment = timezone.now() + timedelta(days=365 * 50)
+        trending.record_views({self.old.pk: 1, self.new.pk: 3}, moment=moment)
+        trending.record_booking(self.old.pk, moment=moment)
+
+        scores = dict(RentTrendingScore.objects.values_list("rent_id", "score"))
+        self.assertTrue(all(math.isfinite(score) for score in scores.values()))
+        self.assertAlmostEqual(scores[self.old.pk] - scores[self.new.pk], math.log(11 / 3))
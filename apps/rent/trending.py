@@ -0,0 +1,135 @@
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Exp, Greatest, Least, Ln
+from django.utils import timezone
+
+from apps.rent.models import RentActivityBucket, RentTrendingScore
+
+# Trending uses forward decay: an event at time t adds
+#     weight * exp((t - TRENDING_EPOCH) / tau)
+# to the listing's activity. Older events keep their contribution while newer
+# ones get exponentially larger, so the ranking equals "decayed to now" without
+# ever rewriting old rows. That sum doubles every half-life and would leave
+# float range within months at short half-lives, so the score column stores its
+# natural log and new events are added with log-sum-exp:
+#     log(e^a + e^b) = max(a, b) + log(1 + e^(min(a, b) - max(a, b)))
+# which only ever exponentiates non-positive numbers.
+VIEW_WEIGHT = 1.0
+BOOKING_WEIGHT = 10.0
+
+SCORE_FIELDS = {'views': VIEW_WEIGHT, 'bookings': BOOKING_WEIGHT}
+
+
+def _epoch():
+    value = getattr(settings, "TRENDING_EPOCH", "2026-01-01")
+    return datetime.fromisoformat(value).replace(tzinfo=dt_timezone.utc)
+
+
+def _tau_seconds():
+    half_life = getattr(settings, "TRENDING_HALF_LIFE_HOURS", 24)
+    return half_life * 3600 / math.log(2)
+
+
+def log_weight(weight, moment):
+    """Natural log of `weight` forward-decayed to `moment`."""
+    return math.log(weight) + (moment - _epoch()).total_seconds() / _tau_seconds()
+
+
+def log_add(a, b):
+    if a is None:
+        return b
+    high, low = max(a, b), min(a, b)
+    return high + math.log1p(math.exp(low - high))
+
+
+def _log_add_expression(value):
+    value = Value(value, output_field=FloatField())
+    high = Greatest(F('score'), value)
+    low = Least(F('score'), value)
+    return Case(
+        When(score__isnull=True, then=value),
+        default=high + Ln(Value(1.0) + Exp(low - high)),
+        output_field=FloatField(),
+    )
+
+
+def current_hour(moment=None):
+    moment = moment or timezone.now()
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def _group_by_count(counts):
+    groups = defaultdict(list)
+    for rent_id, count in counts.items():
+        if count:
+            groups[count].append(rent_id)
+    return groups
+
+
+def record_activity(counts, field, moment=None):
+    """
+    Add `counts` ({rent_id: events}) of `field` ('views' or 'bookings') to the
+    hourly buckets and trending scores. Rows are created first and incremented
+    with F() afterwards, so concurrent writers never overwrite each other.
+    """
+    groups = _group_by_count(counts)
+    if not groups:
+        return
+
+    moment = moment or timezone.now()
+    hour = current_hour(moment)
+    rent_ids = [rent_id for ids in groups.values() for rent_id in ids]
+
+    with transaction.atomic():
+        RentActivityBucket.objects.bulk_create(
+            [RentActivityBucket(rent_id=rent_id, hour=hour) for rent_id in rent_ids],
+            ignore_conflicts=True,
+        )
+        RentTrendingScore.objects.bulk_create(
+            [RentTrendingScore(rent_id=rent_id) for rent_id in rent_ids],
+            ignore_conflicts=True,
+        )
+        for count, ids in groups.items():
+            RentActivityBucket.objects.filter(rent_id__in=ids, hour=hour).update(**{field: F(field) + count})
+            RentTrendingScore.objects.filter(rent_id__in=ids).update(
+                score=_log_add_expression(log_weight(count * SCORE_FIELDS[field], moment)), updated_at=moment,
+            )
+
+
+def record_views(counts, moment=None):
+    record_activity(counts, 'views', moment)
+
+
+def record_booking(rent_id, moment=None):
+    record_activity({rent_id: 1}, 'bookings', moment)
+
+
+def rebuild_scores(window_days=None, batch_size=2000):
+    """
+    Recompute every score from the hourly buckets of the last `window_days`
+    days and drop older buckets. Returns (scores written, buckets deleted).
+    """
+    if window_days is None:
+        window_days = getattr(settings, "TRENDING_WINDOW_DAYS", 14)
+    since = current_hour() - timedelta(days=window_days)
+
+    scores = {}
+    rows = RentActivityBucket.objects.filter(hour__gte=since).values_list('rent_id', 'hour', 'views', 'bookings')
+    for rent_id, hour, views, bookings in rows.iterator(chunk_size=batch_size):
+        activity = views * VIEW_WEIGHT + bookings * BOOKING_WEIGHT
+        if activity > 0:
+            scores[rent_id] = log_add(scores.get(rent_id), log_weight(activity, hour))
+
+    with transaction.atomic():
+        deleted, _ = RentActivityBucket.objects.filter(hour__lt=since).delete()
+        RentTrendingScore.objects.all().delete()
+        RentTrendingScore.objects.bulk_create(
+            [RentTrendingScore(rent_id=rent_id, score=score) for rent_id, score in scores.items()],
+            batch_size=batch_size,
+        )
+    return len(scores), deleted
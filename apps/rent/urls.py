@@ -5,6 +5,7 @@ from apps.rent.views import (
     RentByUserAPIView,
     MyRentsAPIView,
     RentByLocationAPIView, RentCreateAPIView,
+    RentClusterAPIView, RentListAPIView,
 )
 
 router = DefaultRouter()
@@ -15,6 +16,8 @@ urlpatterns = [
     path('by-user/<int:user_id>/', RentByUserAPIView.as_view(), name='rents-by-user'),
     path('by-location/', RentByLocationAPIView.as_view(), name='rents-by-location'),
     path('create/', RentCreateAPIView.as_view(), name='rent-create'),
+    path('clusters/', RentClusterAPIView.as_view(), name='rent-clusters'),
+    path('active/', RentListAPIView.as_view(), name='rent-list-active'),
     path('', include(router.urls)),
 
 ]
@@ -0,0 +1,101 @@
+import atexit
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F
+
+from apps.rent.models import Rent
+from apps.rent.popularity import refresh_popularity_for
+from apps.rent.trending import record_views
+
+logger = logging.getLogger('rental')
+
+# Listing views are counted in memory and written in batches by a background
+# thread every VIEW_COUNT_FLUSH_INTERVAL seconds (and once more at exit), so a
+# request never waits on, or fails because of, the write. Each flush issues one
+# UPDATE per distinct increment, e.g. every rent viewed three times since the
+# last flush gets `view_count = view_count + 3` in a single statement. The
+# arithmetic happens in the database, so concurrent workers never lose hits; a
+# killed process loses at most one interval of views.
+# The same batch refreshes the popularity rows and feeds the trending scores.
+
+_lock = threading.Lock()
+_pending = Counter()
+_flusher = None
+
+
+def _flush_interval():
+    return getattr(settings, "VIEW_COUNT_FLUSH_INTERVAL", 10)
+
+
+def _run_flusher():
+    while True:
+        time.sleep(_flush_interval())
+        try:
+            flush()
+        finally:
+            close_old_connections()
+
+
+def _ensure_flusher():
+    global _flusher
+    if _flusher is not None and _flusher.is_alive():
+        return
+    with _lock:
+        if _flusher is None or not _flusher.is_alive():
+            _flusher = threading.Thread(target=_run_flusher, name="view-count-flusher", daemon=True)
+            _flusher.start()
+
+
+def record_view(rent_id):
+    """Count one view of a rent; the background flusher writes it out."""
+    with _lock:
+        _pending[rent_id] += 1
+    _ensure_flusher()
+
+
+def pending_views(rent_id):
+    with _lock:
+        return _pending.get(rent_id, 0)
+
+
+def flush():
+    """
+    Write buffered views to the database. Returns {rent_id: added views}.
+    Errors are logged and the unwritten views stay buffered for the next flush.
+    """
+    global _pending
+
+    with _lock:
+        counts, _pending = _pending, Counter()
+    if not counts:
+        return {}
+
+    by_increment = defaultdict(list)
+    for rent_id, views in counts.items():
+        by_increment[views].append(rent_id)
+
+    written = {}
+    try:
+        for views, rent_ids in by_increment.items():
+            Rent.all_objects.filter(pk__in=rent_ids).update(view_count=F("view_count") + views)
+            written.update(dict.fromkeys(rent_ids, views))
+    except Exception:
+        logger.exception("Flushing %s buffered listing views failed", sum(counts.values()))
+        with _lock:
+            _pending.update(counts - Counter(written))
+
+    if written:
+        try:
+            refresh_popularity_for(written)
+            record_views(written)
+        except Exception:
+            logger.exception("Updating popularity/trending after a view flush failed")
+    return written
+
+
+atexit.register(flush)
@@ -1,15 +1,28 @@
-from django.db.models import Avg, Count
+from datetime import date, datetime, timedelta
+
 from rest_framework import viewsets, permissions, status,generics
 from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied, NotFound
 from rest_framework.response import Response
-from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.pagination import CursorPagination
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
+from django.db import transaction
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import OrderingFilter
 from rest_framework.generics import ListAPIView, get_object_or_404
 
+from apps.booking.availability import month_calendar
+from apps.core.pagination import KeysetPagination
+from apps.location.geo import nearest, parse_bbox
+from apps.location.normalize import normalize_key
+from apps.rent.cache import cache_public_response
+from apps.rent.clusters import clusters_in_box
+from apps.rent.facets import build_facets
+from apps.rent.fast_serializers import FastRentListMixin, rent_rows, serialize_rent_rows
+from apps.rent.popularity import popular_rent_ids
+from apps.rent.search import search_rents
+from apps.rent.view_counts import record_view
 from apps.rent.models import Rent
 from apps.rent.serializers import RentSerializer, RentCreateSerializer
 from apps.rent.filters import RentFilter
@@ -22,7 +35,13 @@ from apps.rent.serializers import BulkCreateRentSerializer
 from apps.users.models import User
 
 
-class RentViewSet(viewsets.ModelViewSet):
+NEAREST_MAX_RESULTS = 50
+POPULAR_MAX_RESULTS = 50
+TRENDING_MAX_RESULTS = 50
+CALENDAR_MAX_MONTHS = 24
+
+
+class RentViewSet(FastRentListMixin, viewsets.ModelViewSet):
     serializer_class = RentSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrAdminOrReadOnly]
     pagination_class = CursorPagination
@@ -34,8 +53,16 @@ class RentViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         return Rent.objects.select_related("owner", "location").filter(is_deleted=False)
 
+    @cache_public_response("rent-list")
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_public_response("rent-detail")
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     def get_permissions(self):
-        if self.action in ['retrieve', 'list', 'popular']:
+        if self.action in ['retrieve', 'list', 'popular', 'trending', 'nearest', 'search', 'calendar']:
             return [AllowAny()]
         return [IsAuthenticatedOrReadOnly(), IsOwnerOrAdminOrReadOnly()]
 
@@ -65,8 +92,7 @@ class RentViewSet(viewsets.ModelViewSet):
     )
     def increment_view(self, request, pk=None):
         rent = self.get_object()
-        rent.view_count += 1
-        rent.save()
+        record_view(rent.pk)
         return Response({"message": "View count incremented."}, status=200)
 
     def get_object(self):
@@ -125,23 +151,162 @@ class RentViewSet(viewsets.ModelViewSet):
                 'limit',
                 openapi.IN_QUERY,
                 type=openapi.TYPE_INTEGER,
-                description="Limit number of results (default: 10)"
+                description=f"Limit number of results (default: 10, max: {POPULAR_MAX_RESULTS})"
             )
         ]
     )
+    @cache_public_response("rent-popular")
     def popular(self, request):
-        limit = int(request.query_params.get("limit", 10))
+        try:
+            limit = int(request.query_params.get("limit", 10))
+        except ValueError:
+            limit = 10
+        limit = max(1, min(limit, POPULAR_MAX_RESULTS))
+
+        ranked = popular_rent_ids(limit)
+        rows = {row["id"]: row for row in rent_rows(self.get_queryset().filter(pk__in=ranked, is_active=True))}
+        return Response(serialize_rent_rows([rows[rent_id] for rent_id in ranked if rent_id in rows]))
+
+    @action(
+        detail=True,
+        methods=["get"],
+        url_path="calendar",
+        permission_classes=[AllowAny],
+    )
+    @swagger_auto_schema(
+        operation_summary="Get the availability calendar of a listing",
+        operation_description="Month by month, the days taken by confirmed bookings (`booked`) and the days "
+                              "only held by pending requests (`held`). Every other day is free.",
+        manual_parameters=[
+            openapi.Parameter('start', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              description="First month as YYYY-MM (default: current month)"),
+            openapi.Parameter('months', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description=f"Number of months (default: 12, max: {CALENDAR_MAX_MONTHS})"),
+        ]
+    )
+    @cache_public_response("rent-calendar")
+    def calendar(self, request, pk=None):
+        try:
+            start = request.query_params.get("start")
+            first_month = datetime.strptime(start, "%Y-%m").date() if start else date.today().replace(day=1)
+            months = int(request.query_params.get("months", 12))
+        except ValueError:
+            return Response({"detail": "start must be YYYY-MM and months an integer."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        months = max(1, min(months, CALENDAR_MAX_MONTHS))
+
+        rent_id = self.get_queryset().filter(pk=pk).values_list("id", flat=True).first() if pk.isdigit() else None
+        if rent_id is None:
+            raise NotFound("Rent not found.")
+        return Response({"rent": rent_id, "months": month_calendar(rent_id, first_month, months)})
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="trending",
+        permission_classes=[AllowAny],
+    )
+    @swagger_auto_schema(
+        operation_summary="Get trending rental listings",
+        operation_description="Active listings ranked by recent views and bookings, "
+                              "with older activity decaying exponentially.",
+        manual_parameters=[
+            openapi.Parameter(
+                'limit',
+                openapi.IN_QUERY,
+                type=openapi.TYPE_INTEGER,
+                description=f"Limit number of results (default: 10, max: {TRENDING_MAX_RESULTS})"
+            )
+        ]
+    )
+    @cache_public_response("rent-trending")
+    def trending(self, request):
+        try:
+            limit = int(request.query_params.get("limit", 10))
+        except ValueError:
+            limit = 10
+        limit = max(1, min(limit, TRENDING_MAX_RESULTS))
+
         queryset = self.get_queryset().filter(
-            is_active=True
-        ).annotate(
-            avg_rating=Avg("ratings__stars"),
-            calc_ratings_count=Count("ratings")
-        ).order_by(
-            "-avg_rating", "-view_count"
-        )[:limit]
+            is_active=True, trending__score__isnull=False
+        ).order_by("-trending__score", "id")[:limit]
 
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return Response(serialize_rent_rows(rent_rows(queryset)))
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="nearest",
+        permission_classes=[AllowAny],
+    )
+    @swagger_auto_schema(
+        operation_summary="Get the nearest active listings to a point",
+        operation_description="Returns up to `k` active listings sorted by distance, each with `distance_km`. "
+                              "Other listing filters (price, property type, ...) can be combined.",
+        manual_parameters=[
+            openapi.Parameter('lat', openapi.IN_QUERY, type=openapi.TYPE_NUMBER, required=True, description="Latitude"),
+            openapi.Parameter('lng', openapi.IN_QUERY, type=openapi.TYPE_NUMBER, required=True, description="Longitude"),
+            openapi.Parameter('k', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description=f"Number of results (default: 10, max: {NEAREST_MAX_RESULTS})"),
+        ]
+    )
+    def nearest(self, request):
+        try:
+            lat = float(request.query_params["lat"])
+            lng = float(request.query_params["lng"])
+            k = int(request.query_params.get("k", 10))
+        except (KeyError, ValueError):
+            return Response({"detail": "lat and lng are required numbers, k must be an integer."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            return Response({"detail": "lat/lng are out of range."}, status=status.HTTP_400_BAD_REQUEST)
+        k = max(1, min(k, NEAREST_MAX_RESULTS))
+
+        queryset = self.filter_queryset(self.get_queryset()).filter(is_active=True).order_by()
+        ranked = nearest(queryset, lat, lng, k, prefix="location__")
+
+        rents = self.get_queryset().in_bulk([rent_id for rent_id, _ in ranked])
+        serializer = self.get_serializer([rents[rent_id] for rent_id, _ in ranked], many=True)
+
+        data = serializer.data
+        for item, (_, km) in zip(data, ranked):
+            item["distance_km"] = round(km, 3)
+        return Response(data)
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="search",
+        permission_classes=[AllowAny],
+    )
+    @swagger_auto_schema(
+        operation_summary="Full-text search over listing titles and descriptions",
+        operation_description="Returns active listings matching `q`, best match first. "
+                              "Combine with the usual filters such as city, price range or property_type.",
+        manual_parameters=[
+            openapi.Parameter('q', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True, description="Search text"),
+            openapi.Parameter('city', openapi.IN_QUERY, type=openapi.TYPE_STRING, description="City"),
+            openapi.Parameter('min_daily_price', openapi.IN_QUERY, type=openapi.TYPE_NUMBER),
+            openapi.Parameter('max_daily_price', openapi.IN_QUERY, type=openapi.TYPE_NUMBER),
+            openapi.Parameter('property_type', openapi.IN_QUERY, type=openapi.TYPE_STRING),
+            openapi.Parameter('page', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Page number"),
+        ]
+    )
+    def search(self, request):
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            return Response({"detail": "Query parameter 'q' is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        filterset = RentFilter(request.query_params, queryset=self.get_queryset(), request=request)
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+        queryset = search_rents(filterset.qs.filter(is_active=True), query)
+
+        paginator = RentPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = self.get_serializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
     @action(
         detail=False,
@@ -151,10 +316,23 @@ class RentViewSet(viewsets.ModelViewSet):
     )
     @swagger_auto_schema(
         operation_summary="Get rentals available for weekends",
-        operation_description="Returns rentals that are marked as available for daily rental — ideal for weekend stays.",
+        operation_description="Returns daily rentals with no confirmed booking on the upcoming weekend "
+                              "(Friday and Saturday nights), or on `check_in`/`check_out` when given.",
+        manual_parameters=[
+            openapi.Parameter('check_in', openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE),
+            openapi.Parameter('check_out', openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE),
+            openapi.Parameter('include_pending', openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN,
+                              description="Also hide listings with pending requests for these dates"),
+        ]
     )
     def available_on_weekend(self, request):
-        queryset = self.get_queryset().filter(
+        params = request.query_params.copy()
+        if not params.get("check_in"):
+            friday = date.today() + timedelta(days=(4 - date.today().weekday()) % 7)
+            params["check_in"] = friday.isoformat()
+            params["check_out"] = (friday + timedelta(days=2)).isoformat()
+
+        queryset = RentFilter(params, queryset=self.get_queryset(), request=request).qs.filter(
             is_daily_available=True,
             is_active=True,
             is_deleted=False
@@ -169,9 +347,18 @@ class RentViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class RentListAPIView(generics.ListAPIView):
-    queryset = Rent.objects.filter(is_active=True, is_deleted=False)
+class RentPagination(KeysetPagination):
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class RentListAPIView(FastRentListMixin, generics.ListAPIView):
+    queryset = Rent.objects.select_related("owner", "location").filter(
+        is_active=True, is_deleted=False
+    ).order_by('-created_at', '-id')
     serializer_class = RentSerializer
+    pagination_class = RentPagination
     filter_backends = [DjangoFilterBackend]
     filterset_class = RentFilter
 
@@ -183,6 +370,10 @@ class RentListAPIView(generics.ListAPIView):
             - city, district, state
             - daily/monthly price range
             - location radius (via lat, lng, radius_km)
+            - map viewport (via bbox=west,south,east,north)
+            - free dates (via check_in, check_out; include_pending=true also hides pending requests)
+            The response also carries `facets`: listing counts per city, property type,
+            rooms and daily price bucket for the same filters.
         """,
         manual_parameters=[
             openapi.Parameter('city', openapi.IN_QUERY, description="City name", type=openapi.TYPE_STRING),
@@ -190,13 +381,36 @@ class RentListAPIView(generics.ListAPIView):
             openapi.Parameter('lat', openapi.IN_QUERY, description="Latitude (for radius search)", type=openapi.TYPE_NUMBER),
             openapi.Parameter('lng', openapi.IN_QUERY, description="Longitude (for radius search)", type=openapi.TYPE_NUMBER),
             openapi.Parameter('radius_km', openapi.IN_QUERY, description="Radius in kilometers", type=openapi.TYPE_NUMBER),
+            openapi.Parameter('bbox', openapi.IN_QUERY, description="Map viewport: west,south,east,north", type=openapi.TYPE_STRING),
             openapi.Parameter('min_daily_price', openapi.IN_QUERY, type=openapi.TYPE_NUMBER),
             openapi.Parameter('max_daily_price', openapi.IN_QUERY, type=openapi.TYPE_NUMBER),
+            openapi.Parameter('check_in', openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE,
+                              description="Only listings free from this night on"),
+            openapi.Parameter('check_out', openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE,
+                              description="Departure date (default: one night)"),
+            openapi.Parameter('include_pending', openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN,
+                              description="Also hide listings with pending requests for these dates"),
+            openapi.Parameter('cursor', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              description="Opt in to cursor paging: send it empty for the first page, then follow `next`/`previous`"),
+            openapi.Parameter('page', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Page number"),
         ]
     )
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        facets = build_facets(queryset)
+        rows = rent_rows(queryset)
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            response = self.get_paginated_response(serialize_rent_rows(page))
+            response.data['facets'] = facets
+            return response
+
+        return Response({'results': serialize_rent_rows(rows), 'facets': facets})
+
 
 class RentCreateAPIView(generics.CreateAPIView):
     queryset = Rent.objects.all()
@@ -215,7 +429,9 @@ class RentCreateAPIView(generics.CreateAPIView):
         if not user.is_host:
             raise PermissionDenied("Only hosts can create rental listings.")
 
-        serializer.save(owner=user)
+        # Keeps the listing and its outbox notification in one transaction.
+        with transaction.atomic():
+            serializer.save(owner=user)
 
     def post(self, request, *args, **kwargs):
         return super().post(request, *args, **kwargs)
@@ -255,12 +471,6 @@ class BulkCreateRentAPIView(APIView):
 #        return Response({"detail": "Listing marked as deleted."}, status=status.HTTP_200_OK)
 
 
-class RentPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = 'page_size'
-    max_page_size = 100
-
-
 class RentByUserAPIView(APIView):
     permission_classes = [permissions.IsAdminUser]
 
@@ -274,14 +484,17 @@ class RentByUserAPIView(APIView):
         serializer = RentSerializer(rents, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
-class MyRentsAPIView(ListAPIView):
+class MyRentsAPIView(FastRentListMixin, ListAPIView):
     serializer_class = RentSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = RentPagination
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['is_active']
 
     def get_queryset(self):
-        return Rent.objects.filter(owner=self.request.user, is_deleted=False).order_by('id')
+        return Rent.objects.select_related("owner", "location").filter(
+            owner=self.request.user, is_deleted=False
+        ).order_by('id')
 
     @swagger_auto_schema(
         operation_summary="Get current user's rental listings",
@@ -292,6 +505,12 @@ class MyRentsAPIView(ListAPIView):
                 description="Filter by active status (true or false)",
                 type=openapi.TYPE_BOOLEAN
             ),
+            openapi.Parameter(
+                'cursor',
+                openapi.IN_QUERY,
+                description="Opt in to cursor paging: send it empty for the first page, then follow `next`/`previous`",
+                type=openapi.TYPE_STRING
+            ),
             openapi.Parameter(
                 'page',
                 openapi.IN_QUERY,
@@ -305,7 +524,7 @@ class MyRentsAPIView(ListAPIView):
         return super().get(request, *args, **kwargs)
 
 
-class RentByLocationAPIView(ListAPIView):
+class RentByLocationAPIView(FastRentListMixin, ListAPIView):
     serializer_class = RentSerializer
     permission_classes = [AllowAny]
     pagination_class = RentPagination
@@ -314,6 +533,19 @@ class RentByLocationAPIView(ListAPIView):
     ordering_fields = ['daily_price', 'monthly_price', 'created_at']
     ordering = ['-created_at']
 
+    def get_queryset(self):
+        city = self.request.query_params.get('city')
+        district = self.request.query_params.get('district')
+
+        queryset = Rent.objects.select_related('owner', 'location').filter(is_active=True, is_deleted=False)
+
+        if city:
+            queryset = queryset.filter(location__city_key=normalize_key(city))
+        if district:
+            queryset = queryset.filter(location__district_key=normalize_key(district))
+
+        return queryset
+
     @swagger_auto_schema(
         operation_summary="Filter listings by city and district",
         manual_parameters=[
@@ -321,21 +553,41 @@ class RentByLocationAPIView(ListAPIView):
             openapi.Parameter('location__district', openapi.IN_QUERY, type=openapi.TYPE_STRING, description="District"),
             openapi.Parameter('ordering', openapi.IN_QUERY, type=openapi.TYPE_STRING,
                               description="Sort by fields: daily_price, monthly_price, created_at (prefix with '-' for descending)"),
-            openapi.Parameter('page', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Page number"),
+            openapi.Parameter('cursor', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              description="Opt in to cursor paging: send it empty for the first page, then follow `next`/`previous` "
+                                          "(daily_price and created_at orderings)"),
+            openapi.Parameter('page', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description="Page number"),
         ]
     )
+    @cache_public_response("rents-by-location")
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
 
-    def get_queryset(self):
-        city = self.request.query_params.get('city')
-        district = self.request.query_params.get('district')
-
-        queryset = Rent.objects.select_related('location').filter(is_active=True, is_deleted=False)
 
-        if city:
-            queryset = queryset.filter(location__city__iexact=city)
-        if district:
-            queryset = queryset.filter(location__district__iexact=district)
+class RentClusterAPIView(APIView):
+    permission_classes = [AllowAny]
 
-        return queryset
+    @swagger_auto_schema(
+        operation_summary="Map clusters of active listings",
+        operation_description="Returns pre-aggregated listing clusters (count, centroid, min/avg daily price) "
+                              "for the map viewport at the given zoom level.",
+        manual_parameters=[
+            openapi.Parameter('bbox', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True,
+                              description="Map viewport: west,south,east,north"),
+            openapi.Parameter('zoom', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=True,
+                              description="Map zoom level (0-22)"),
+        ]
+    )
+    def get(self, request):
+        try:
+            south, north, west, east = parse_bbox(request.query_params.get('bbox', ''))
+            zoom = int(request.query_params.get('zoom', ''))
+        except ValueError:
+            return Response({"detail": "bbox (west,south,east,north) and integer zoom are required."},
+                            status=status.HTTP_400_BAD_REQUEST)
 
+        if not 0 <= zoom <= 22:
+            return Response({"detail": "zoom must be between 0 and 22."}, status=status.HTTP_400_BAD_REQUEST)
 
+        return Response(clusters_in_box(south, north, west, east, zoom))
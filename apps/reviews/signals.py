@@ -1,5 +1,8 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+
+from apps.notifications import outbox
+from apps.rent.cache import invalidate_on_commit
 from .models import Rating
 import logging
 logger = logging.getLogger('rental')
@@ -19,5 +22,11 @@ def update_rent_rating(sender, instance, created, **kwargs):
             f"Host '{host.email}' received a new rating: {instance.stars}★ "
             f"for '{rent.title}' from '{instance.renter.email}'"
         )
-        print(f"[NOTIFICATION] {msg}")
-        logger.info(msg)
\ No newline at end of file
+        outbox.add('rating_received', host.email, f"New {instance.stars}★ rating for '{rent.title}'", msg)
+        logger.info(msg)
+
+
+@receiver(post_save, sender=Rating)
+@receiver(post_delete, sender=Rating)
+def invalidate_rent_responses_on_rating(sender, **kwargs):
+    invalidate_on_commit()
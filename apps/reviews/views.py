@@ -1,3 +1,4 @@
+from django.db import transaction
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 from .models import Rating
@@ -11,3 +12,8 @@ class RatingViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         return self.queryset.filter(renter=self.request.user)
 
+
+    def perform_create(self, serializer):
+        # The rating signals update the rent and queue the host notification.
+        with transaction.atomic():
+            serializer.save()
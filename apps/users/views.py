@@ -221,9 +221,7 @@ class BookingWithCommissionAPIView(APIView):
         return Response({"booking_id": booking.id, "commission": commission}, status=status.HTTP_200_OK)
 
     def calculate_commission(self, booking):
-        total_days = (booking.end_date - booking.start_date).days or 1
-        daily_price = booking.rent.daily_price or 0
-        return round(total_days * float(daily_price) * 0.1, 2)
+        return float(booking.commission_amount)
 
 
 from django.db.models import F, ExpressionWrapper, DecimalField